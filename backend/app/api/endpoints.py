@@ -1,15 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import uuid
-import json
-from datetime import datetime
-from pathlib import Path
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 
-from app.core.config import settings
-from app.core.state import orchestrator, tracker, executor, recon, roadmap
+from app.core.state import orchestrator, tracker, executor, dojo_jobs, recon, roadmap, resume_index, resume_blobs, resumes
 from app.models.schemas import (
     DashboardStats,
     InterviewStartRequest,
@@ -24,10 +21,13 @@ from app.models.schemas import (
     JobApplication,
     CodeExecutionRequest,
     CodeExecutionResponse,
+    CodeExecutionJob,
+    DojoProblem,
     ReconRequest,
     ReconResponse,
     ResumeItem,
 )
+from app.services.resume_store import UploadTooLarge
 from pydantic import BaseModel
 
 class AnswerRequest(BaseModel):
@@ -37,7 +37,7 @@ router = APIRouter()
 
 
 @router.post("/resume/upload")
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(file: UploadFile = File(...), user_id: str = ""):
     if not file.filename:
         raise HTTPException(status_code=400, detail="Missing filename")
 
@@ -45,46 +45,32 @@ async def upload_resume(file: UploadFile = File(...)):
     if ext not in {".pdf"}:
         raise HTTPException(status_code=400, detail="Only PDF resumes are supported")
 
-    upload_dir = Path(settings.data_dir) / "uploads"
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
     file_id = str(uuid.uuid4())
-    dest = upload_dir / f"{file_id}.pdf"
-
-    content = await file.read()
-    dest.write_bytes(content)
-
-    # Update metadata
-    resumes_file = Path(settings.data_dir) / "resumes.json"
-    resumes = []
-    if resumes_file.exists():
-        try:
-            resumes = json.loads(resumes_file.read_text())
-        except:
-            pass
-    
-    new_resume = {
-        "id": file_id,
-        "name": file.filename,
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        "is_default": len(resumes) == 0
-    }
-    resumes.append(new_resume)
-    resumes_file.write_text(json.dumps(resumes, indent=2))
-
-    return {"resume_id": file_id, "path": str(dest)}
+    try:
+        blob = await resume_blobs.save(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    # The metadata store takes a lock and may wait on SQLite's busy timeout; keep it off the loop
+    await asyncio.to_thread(resumes.add, file_id, file.filename, blob.sha256, user_id=user_id)
+
+    # Parsed and embedded in the background; the upload doesn't wait for it
+    resume_index.schedule(file_id, blob.path, blob.sha256)
+
+    return {"resume_id": file_id, "path": str(blob.path)}
 
 
 @router.get("/resume/list", response_model=list[ResumeItem])
-async def list_resumes():
-    resumes_file = Path(settings.data_dir) / "resumes.json"
-    if not resumes_file.exists():
-        return []
-    try:
-        data = json.loads(resumes_file.read_text())
-        return [ResumeItem(**item) for item in data]
-    except:
-        return []
+async def list_resumes(user_id: str = "", limit: int = Query(100, ge=1, le=500), offset: int = Query(0, ge=0)):
+    items = await asyncio.to_thread(resumes.list, user_id=user_id, limit=limit, offset=offset)
+    return [ResumeItem(**item) for item in items]
+
+
+@router.post("/resume/{resume_id}/default", response_model=ResumeItem)
+async def set_default_resume(resume_id: str, user_id: str = ""):
+    if not await asyncio.to_thread(resumes.set_default, resume_id, user_id=user_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return ResumeItem(**await asyncio.to_thread(resumes.get, resume_id))
 
 
 @router.post("/interview/start", response_model=InterviewStartResponse)
@@ -236,9 +222,47 @@ async def add_tracker_job(job: JobApplication):
     return tracker.add_job(job)
 
 
+@router.get("/dojo/problems", response_model=list[DojoProblem])
+async def list_dojo_problems():
+    return [
+        DojoProblem(
+            id=p.id,
+            title=p.title,
+            version=p.version,
+            entrypoint=p.entrypoint,
+            num_cases=p.num_cases,
+            scalable=p.scalable,
+            expected_complexity=p.expected_complexity,
+        )
+        for p in executor.problems.list()
+    ]
+
+
 @router.post("/dojo/execute", response_model=CodeExecutionResponse)
 async def execute_code(request: CodeExecutionRequest):
-    return executor.execute(request.code, request.language, request.problem_id)
+    return await executor.execute(request.code, request.language, request.problem_id, request.analyze_complexity)
+
+
+@router.post("/dojo/jobs", response_model=CodeExecutionJob, status_code=202)
+async def submit_code_job(request: CodeExecutionRequest):
+    job = dojo_jobs.submit(request.code, request.language, request.problem_id, request.analyze_complexity)
+    return job.snapshot()
+
+
+@router.get("/dojo/jobs/{job_id}", response_model=CodeExecutionJob)
+async def get_code_job(job_id: str):
+    try:
+        return dojo_jobs.get(job_id).snapshot()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+
+@router.delete("/dojo/jobs/{job_id}", response_model=CodeExecutionJob)
+async def cancel_code_job(job_id: str):
+    try:
+        return (await dojo_jobs.cancel(job_id)).snapshot()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown job")
 
 
 @router.post("/recon/search", response_model=ReconResponse)
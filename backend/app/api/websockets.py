@@ -1,20 +1,27 @@
 from __future__ import annotations
 
 import json
+import time
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from app.core.state import orchestrator
+from app.core.state import dojo_jobs, orchestrator, transcriber
+from app.services.telemetry_protocol import ACK_EVERY_FRAMES, ACK_EVERY_S, SUBPROTOCOL, decode_batch, encode_ack
 
 router = APIRouter()
 
 
 @router.websocket("/ws/interview/{session_id}")
 async def interview_ws(websocket: WebSocket, session_id: str):
-    await websocket.accept()
+    # Clients that offer the binary telemetry subprotocol get it; everyone else stays on JSON
+    binary = SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+    await websocket.accept(subprotocol=SUBPROTOCOL if binary else None)
+    received = 0
+    acked = 0
+    last_ack = time.monotonic()
 
     try:
-        session = orchestrator.get_session(session_id)
+        session = await orchestrator.get_session(session_id)
         await websocket.send_json(
             {
                 "type": "question",
@@ -23,7 +30,26 @@ async def interview_ws(websocket: WebSocket, session_id: str):
         )
 
         while True:
-            raw = await websocket.receive_text()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes") is not None:
+                try:
+                    _, frames = decode_batch(message["bytes"])
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "payload": {"message": str(e)}})
+                    continue
+                await orchestrator.submit_telemetry_batch(session_id=session_id, frames=frames)
+                received += len(frames)
+                # One cumulative ack covers many batches
+                if received - acked >= ACK_EVERY_FRAMES or time.monotonic() - last_ack >= ACK_EVERY_S:
+                    await websocket.send_bytes(encode_ack(received))
+                    acked = received
+                    last_ack = time.monotonic()
+                continue
+
+            raw = message.get("text") or ""
             try:
                 msg = json.loads(raw)
             except json.JSONDecodeError:
@@ -39,7 +65,12 @@ async def interview_ws(websocket: WebSocket, session_id: str):
                     await websocket.send_json({"type": "error", "payload": {"message": "Empty answer"}})
                     continue
 
-                result = await orchestrator.submit_answer(session_id=session_id, answer_text=answer_text)
+                result = None
+                async for kind, value in orchestrator.submit_answer_stream(session_id=session_id, answer_text=answer_text):
+                    if kind == "delta":
+                        await websocket.send_json({"type": "feedback_delta", "payload": value})
+                    else:
+                        result = value
                 await websocket.send_json({"type": "feedback", "payload": result.feedback.model_dump()})
 
                 if result.next_question is None:
@@ -56,3 +87,74 @@ async def interview_ws(websocket: WebSocket, session_id: str):
 
     except WebSocketDisconnect:
         return
+
+
+@router.websocket("/ws/interview/{session_id}/audio")
+async def interview_audio_ws(websocket: WebSocket, session_id: str, sample_rate: int = 16000):
+    """Binary frames are 16-bit little-endian mono PCM at `sample_rate`;
+    {"type": "audio_end"} transcribes what is buffered and replies with the full text."""
+    await websocket.accept()
+    try:
+        await orchestrator.get_session(session_id)
+    except KeyError:
+        await websocket.send_json({"type": "error", "payload": {"message": "Unknown session"}})
+        await websocket.close()
+        return
+    if transcriber is None:
+        await websocket.send_json({"type": "error", "payload": {"message": "Server-side transcription is not enabled"}})
+        await websocket.close()
+        return
+    if not 8000 <= sample_rate <= 48000:
+        await websocket.send_json({"type": "error", "payload": {"message": "Unsupported sample rate"}})
+        await websocket.close()
+        return
+
+    async def send(kind: str, payload: dict) -> None:
+        await websocket.send_json({"type": kind, "payload": payload})
+
+    stream = transcriber.open_stream(send, sample_rate)
+    if stream is None:
+        # 1013: try again later
+        await websocket.send_json({"type": "error", "payload": {"message": "Transcription is at capacity"}})
+        await websocket.close(code=1013)
+        return
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                # Blocks while this stream's segment queue is full, which is the backpressure
+                await stream.feed(message["bytes"])
+                continue
+            try:
+                msg = json.loads(message.get("text") or "")
+            except json.JSONDecodeError:
+                await websocket.send_json({"type": "error", "payload": {"message": "Invalid JSON"}})
+                continue
+            if msg.get("type") == "audio_end":
+                text, speech = await stream.finish()
+                await websocket.send_json({"type": "transcript", "payload": {"text": text, "speech": speech}})
+            else:
+                await websocket.send_json({"type": "error", "payload": {"message": "Unknown message type"}})
+    except WebSocketDisconnect:
+        return
+    finally:
+        await stream.close()
+
+
+@router.websocket("/ws/dojo/{job_id}")
+async def dojo_job_ws(websocket: WebSocket, job_id: str):
+    await websocket.accept()
+
+    try:
+        events = dojo_jobs.subscribe(job_id)
+        async for event in events:
+            await websocket.send_json(event)
+        await websocket.close()
+    except KeyError:
+        await websocket.send_json({"type": "error", "payload": {"message": "Unknown job"}})
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
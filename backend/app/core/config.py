@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from pathlib import Path
 import os
 
 
@@ -12,6 +13,35 @@ class Settings(BaseModel):
     data_dir: str = os.getenv("INTERVIEWFLOW_DATA_DIR", "backend/data")
     groq_api_key: str | None = os.getenv("GROQ_API_KEY")
     groq_model: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    llm_requests_per_minute: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    llm_cache_size: int = int(os.getenv("LLM_CACHE_SIZE", "2048"))
+    llm_cache_persist: bool = os.getenv("LLM_CACHE_PERSIST", "true").lower() in {"1", "true", "yes"}
+    llm_eval_batching: bool = os.getenv("LLM_EVAL_BATCHING", "false").lower() in {"1", "true", "yes"}
+    llm_eval_batch_window_ms: float = float(os.getenv("LLM_EVAL_BATCH_WINDOW_MS", "20"))
+    llm_eval_batch_max: int = int(os.getenv("LLM_EVAL_BATCH_MAX", "8"))
+    question_bank_enabled: bool = os.getenv("QUESTION_BANK_ENABLED", "true").lower() in {"1", "true", "yes"}
+    question_bank_similarity: float = float(os.getenv("QUESTION_BANK_SIMILARITY", "0.7"))
+    resume_max_bytes: int = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+    session_store: str = os.getenv("SESSION_STORE", "disk")
+    session_cache_size: int = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+    session_idle_ttl_s: float = float(os.getenv("SESSION_IDLE_TTL_S", "1800"))
+    audio_transcription: bool = os.getenv("AUDIO_TRANSCRIPTION", "false").lower() in {"1", "true", "yes"}
+    whisper_model: str = os.getenv("WHISPER_MODEL", "base")
+    audio_workers: int = int(os.getenv("AUDIO_WORKERS", "1"))
+    audio_max_streams: int = int(os.getenv("AUDIO_MAX_STREAMS", "8"))
+    audio_queue_segments: int = int(os.getenv("AUDIO_QUEUE_SEGMENTS", "4"))
+    recon_search_timeout_s: float = float(os.getenv("RECON_SEARCH_TIMEOUT_S", "8"))
+    recon_max_stale_s: float = float(os.getenv("RECON_MAX_STALE_S", str(90 * 86400)))
+    recon_section_tokens: int = int(os.getenv("RECON_SECTION_TOKENS", "300"))
+    problems_dir: str = os.getenv("DOJO_PROBLEMS_DIR", str(Path(__file__).resolve().parents[1] / "problems"))
+    sandbox_pool_size: int = int(os.getenv("SANDBOX_POOL_SIZE", "4"))
+    sandbox_max_jobs: int = int(os.getenv("SANDBOX_MAX_JOBS_PER_WORKER", "50"))
+    sandbox_timeout_s: float = float(os.getenv("SANDBOX_TIMEOUT_S", "5"))
+    complexity_budget_s: float = float(os.getenv("DOJO_COMPLEXITY_BUDGET_S", "3"))
+    dojo_cache_size: int = int(os.getenv("DOJO_CACHE_SIZE", "512"))
+    dojo_cache_ttl_s: float = float(os.getenv("DOJO_CACHE_TTL_S", "3600"))
+    dojo_cache_persist: bool = os.getenv("DOJO_CACHE_PERSIST", "false").lower() in {"1", "true", "yes"}
 
 
 settings = Settings()
@@ -1,17 +1,73 @@
 from __future__ import annotations
 
+from pathlib import Path
+
+from app.core.config import settings
 from app.services.orchestrator import InterviewOrchestrator
 from app.services.tracker import TrackerService
 from app.services.code_executor import CodeExecutor
+from app.services.dojo_jobs import DojoJobQueue
 from app.services.recon_service import ReconService
 from app.services.roadmap_service import RoadmapService
 from app.services.llm_agent import LlmAgent
+from app.services.eval_batcher import EvaluationBatcher
+from app.services.llm_gateway import LlmGateway
+from app.services.rag_engine import RagEngine
+from app.services.resume_index import ResumeIndex
+from app.services.resume_store import ResumeBlobStore, ResumeMetadataStore
+from app.services.session_store import DiskSessionStore, MemorySessionStore
+from app.services.transcriber import TranscriptionPool
 
 # Initialize shared services
-llm_agent = LlmAgent() # Shared LLM instance if needed, or orchestrator has its own
+# Every LLM call goes through one gateway: one connection pool, one rate limiter
+llm_gateway = LlmGateway(
+    max_concurrency=settings.llm_max_concurrency,
+    requests_per_minute=settings.llm_requests_per_minute,
+)
+llm_agent = LlmAgent(llm_gateway)
+
+eval_batcher = (
+    EvaluationBatcher(llm_agent, max_batch=settings.llm_eval_batch_max, window_ms=settings.llm_eval_batch_window_ms)
+    if settings.llm_eval_batching
+    else None
+)
+
+resume_index = ResumeIndex(settings.data_dir)
+resumes = ResumeMetadataStore(
+    Path(settings.data_dir) / "resumes.sqlite3", legacy_json=Path(settings.data_dir) / "resumes.json"
+)
+resume_blobs = ResumeBlobStore(Path(settings.data_dir) / "uploads", max_bytes=settings.resume_max_bytes)
+
+session_store = (
+    DiskSessionStore(
+        Path(settings.data_dir) / "sessions",
+        max_sessions=settings.session_cache_size,
+        idle_ttl_s=settings.session_idle_ttl_s,
+    )
+    if settings.session_store == "disk"
+    else MemorySessionStore()
+)
 
-orchestrator = InterviewOrchestrator() # Orchestrator creates its own LLM agent internally currently
+orchestrator = InterviewOrchestrator(
+    llm_agent=llm_agent,
+    rag=RagEngine(llm_gateway, resume_index=resume_index),
+    batcher=eval_batcher,
+    store=session_store,
+)
+# Server-side speech-to-text needs the optional deps in requirements-audio.txt
+transcriber = None
+if settings.audio_transcription:
+    if TranscriptionPool.available():
+        transcriber = TranscriptionPool(
+            model=settings.whisper_model,
+            workers=settings.audio_workers,
+            max_streams=settings.audio_max_streams,
+            max_queued=settings.audio_queue_segments,
+        )
+    else:
+        print("Audio Error: AUDIO_TRANSCRIPTION is set but openai-whisper is not installed")
 tracker = TrackerService()
 executor = CodeExecutor()
-recon = ReconService(llm_agent=orchestrator._llm) # Reuse the LLM agent from orchestrator
-roadmap = RoadmapService(llm_agent=orchestrator._llm)
+dojo_jobs = DojoJobQueue(executor)
+recon = ReconService(llm_agent=llm_agent)
+roadmap = RoadmapService(llm_agent=llm_agent)
@@ -1,10 +1,31 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import router as http_router
+from app.api.middleware import UploadLimitMiddleware
 from app.api.websockets import router as ws_router
+from app.core.config import settings
+from app.core.state import executor, llm_gateway, orchestrator, transcriber
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the sandbox pool before the first Dojo submission arrives
+    await executor.start()
+    # Whisper models take seconds to load; do it before the first interview, not during it
+    if transcriber is not None:
+        await transcriber.start()
+    yield
+    if transcriber is not None:
+        await transcriber.close()
+    await executor.close()
+    await orchestrator.close()
+    await llm_gateway.aclose()
+
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="InterviewFlow AI Backend")
+    app = FastAPI(title="InterviewFlow AI Backend", lifespan=lifespan)
 
     # CORS is CRITICAL now because Frontend (Localhost) and Backend (Hugging Face) are on different domains.
     app.add_middleware(
@@ -15,6 +36,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Enforced while the body streams in, not after it has been spooled to disk
+    app.add_middleware(UploadLimitMiddleware, paths={"/api/resume/upload"}, max_bytes=settings.resume_max_bytes)
+
     app.include_router(http_router, prefix="/api")
     app.include_router(ws_router)
 
@@ -37,6 +37,8 @@ class InterviewReport(BaseModel):
     hiring_probability: float = Field(ge=0, le=1)
     averages: dict[str, float]
     events: list[dict[str, Any]] = Field(default_factory=list)
+    # Rolling gaze/posture stats, emotion transitions and alerts from the telemetry stream
+    vision: dict[str, Any] = Field(default_factory=dict)
     areas_of_improvement: list[str] = Field(default_factory=list)
     mistakes: list[str] = Field(default_factory=list)
     tips: list[str] = Field(default_factory=list)
@@ -125,12 +127,25 @@ class ReconResponse(BaseModel):
     tips: list[str]
     news: list[str]
     sentiment: dict | None = None
+    # Seconds since each section's search results were fetched
+    sectionAges: dict[str, float] | None = None
 
 
 class CodeExecutionRequest(BaseModel):
     code: str
     language: str = "python"
     problem_id: str | None = None
+    analyze_complexity: bool = False
+
+
+class DojoProblem(BaseModel):
+    id: str
+    title: str
+    version: int
+    entrypoint: str
+    num_cases: int
+    scalable: bool = False
+    expected_complexity: str | None = None
 
 
 class TestCaseResult(BaseModel):
@@ -140,6 +155,9 @@ class TestCaseResult(BaseModel):
     actual: str
     passed: bool
     error: str | None = None
+    runtime_ms: float | None = None
+    cpu_ms: float | None = None
+    memory_kb: int | None = None
 
 
 class CodeExecutionResponse(BaseModel):
@@ -147,6 +165,14 @@ class CodeExecutionResponse(BaseModel):
     output: str | None = None
     error: str | None = None
     complexity: dict[str, str] | None = None
+    scaling: list[dict] | None = None
+
+
+class CodeExecutionJob(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "completed", "cancelled"]
+    results: list[TestCaseResult] = Field(default_factory=list)
+    response: CodeExecutionResponse | None = None
 
 
 class DashboardStats(BaseModel):
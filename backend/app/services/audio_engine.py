@@ -1,22 +1,166 @@
 from __future__ import annotations
 
 import re
+from collections import deque
 
+# Matched on whole words, so "you know" counts once and a bare "you" or "know" never does
+FILLER_PHRASES = ("um", "umm", "uh", "uhh", "uhm", "erm", "er", "hmm", "you know", "i mean", "kind of", "sort of")
+# Upper edges of the pause histogram buckets, in seconds; the last bucket is open-ended
+PAUSE_BUCKETS = (0.5, 1.0, 2.0, 4.0)
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class PhraseAutomaton:
+    """Aho-Corasick over words: finds every phrase ending at each new word in O(1) amortized."""
+
+    def __init__(self, phrases: tuple[str, ...]) -> None:
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        # Phrases ending at each node, including those inherited through fail links
+        self.output: list[tuple[str, ...]] = [()]
+        for phrase in phrases:
+            node = 0
+            for word in phrase.split():
+                if word not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                    self.goto[node][word] = len(self.goto) - 1
+                node = self.goto[node][word]
+            self.output[node] += (phrase,)
+
+        # Children of the root keep fail = 0; deeper nodes are filled in breadth-first
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.output[child] += self.output[self.fail[child]]
+
+    def step(self, node: int, word: str) -> int:
+        while node and word not in self.goto[node]:
+            node = self.fail[node]
+        return self.goto[node].get(word, 0)
+
+
+FILLERS = PhraseAutomaton(FILLER_PHRASES)
+
+
+class SpeechAnalyzer:
+    """Running filler, pace and pause stats for one answer, fed text as it arrives.
+
+    `feed` costs O(new text) and `summary` O(1): the automaton state and
+    all counters carry over between calls, and nothing already seen is
+    re-read. Timestamps, when given, are the spoken span of each chunk.
+    """
 
-class AudioEngine:
     def __init__(self) -> None:
-        pass
+        self.node = 0
+        self.words = 0
+        self.filler_words = 0
+        self.fillers: dict[str, int] = {}
+        self.speaking_s = 0.0
+        self.first_start: float | None = None
+        self.last_end: float | None = None
+        self.pauses = [0] * (len(PAUSE_BUCKETS) + 1)
+        self.pause_total_s = 0.0
+        self.longest_pause_s = 0.0
+        # A word cut off at the end of the previous chunk
+        self._tail = ""
 
-    def analyze_transcript(self, text: str) -> dict:
-        tokens = [t for t in re.split(r"\s+", text.strip()) if t]
-        filler = sum(1 for t in tokens if t.lower() in {"um", "uh", "like", "you", "know"})
+    def feed(self, text: str, start: float | None = None, end: float | None = None) -> None:
+        text = self._tail + text.lower()
+        matches = list(WORD_RE.finditer(text))
+        # A chunk ending mid-word keeps the fragment for the next one
+        self._tail = ""
+        if matches and matches[-1].end() == len(text):
+            self._tail = matches.pop().group()
+        for match in matches:
+            self._word(match.group())
 
-        fluency = 1.0
-        if tokens:
-            fluency = max(0.0, 1.0 - (filler / max(1, len(tokens))))
+        if start is not None and end is not None and end >= start:
+            if self.last_end is not None and start > self.last_end:
+                self._pause(start - self.last_end)
+            if self.first_start is None:
+                self.first_start = start
+            self.last_end = max(end, self.last_end or end)
+            self.speaking_s += end - start
+
+    def flush(self) -> None:
+        if self._tail:
+            self._word(self._tail)
+            self._tail = ""
+
+    def summary(self) -> dict:
+        words = self.words + (1 if self._tail else 0)
+        fluency = max(0.0, 1.0 - self.filler_words / words) if words else 1.0
+        stats: dict = {
+            "fluency": fluency,
+            "filler_count": sum(self.fillers.values()),
+            "fillers": dict(self.fillers),
+            "words": words,
+        }
+        if self.speaking_s > 0:
+            stats["wpm"] = round(words * 60.0 / self.speaking_s, 1)
+            stats["pauses"] = {
+                "count": sum(self.pauses),
+                "total_s": round(self.pause_total_s, 2),
+                "longest_s": round(self.longest_pause_s, 2),
+                "histogram": dict(zip(_bucket_labels(), self.pauses)),
+            }
 
         notes = []
-        if filler >= 3:
+        if stats["filler_count"] >= 3:
             notes.append("High filler-word usage")
+        wpm = stats.get("wpm")
+        if wpm is not None and words >= 30:
+            if wpm > 180:
+                notes.append("Speaking pace is fast")
+            elif wpm < 100:
+                notes.append("Speaking pace is slow")
+        if self.pauses[-1]:
+            notes.append(f"Long pauses (over {PAUSE_BUCKETS[-1]:g}s)")
+        stats["notes"] = notes
+        return stats
+
+    def preview(self, text: str, start: float | None = None, end: float | None = None) -> dict:
+        """Summary as if `text` were appended, leaving this analyzer untouched (for partial transcripts)."""
+        trial = SpeechAnalyzer()
+        trial.__dict__.update(self.__dict__, fillers=dict(self.fillers), pauses=list(self.pauses))
+        trial.feed(text, start, end)
+        trial.flush()
+        return trial.summary()
+
+    def _word(self, word: str) -> None:
+        self.words += 1
+        self.node = FILLERS.step(self.node, word)
+        for phrase in FILLERS.output[self.node]:
+            self.fillers[phrase] = self.fillers.get(phrase, 0) + 1
+            self.filler_words += len(phrase.split())
+
+    def _pause(self, gap: float) -> None:
+        bucket = next((i for i, edge in enumerate(PAUSE_BUCKETS) if gap < edge), len(PAUSE_BUCKETS))
+        self.pauses[bucket] += 1
+        self.pause_total_s += gap
+        self.longest_pause_s = max(self.longest_pause_s, gap)
+
+
+def _bucket_labels() -> list[str]:
+    edges = ["0", *(f"{edge:g}" for edge in PAUSE_BUCKETS)]
+    return [f"{lo}-{hi}s" for lo, hi in zip(edges, edges[1:])] + [f"{edges[-1]}s+"]
 
-        return {"fluency": fluency, "filler_count": filler, "notes": notes}
+
+class AudioEngine:
+    def __init__(self) -> None:
+        pass
+
+    def analyze_transcript(self, text: str) -> dict:
+        analyzer = SpeechAnalyzer()
+        analyzer.feed(text)
+        analyzer.flush()
+        return analyzer.summary()
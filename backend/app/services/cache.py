@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+
+class SqliteCacheStore:
+    """On-disk backing for LruTtlCache, shared by every worker process on the host.
+
+    Values are stored as JSON text under (namespace, key). The database runs in
+    WAL mode so readers in other processes don't block on writers.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str | Path, namespace: str, max_rows: int = 50_000) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self.max_rows = max_rows
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (namespace, expires_at)")
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune()
+
+    def _prune(self) -> None:
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time()),
+        )
+        # Over the cap: drop the entries closest to expiry first
+        self._conn.execute(
+            """
+            DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                SELECT key FROM cache_entries WHERE namespace = ?
+                ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.namespace, self.namespace, self.max_rows),
+        )
+
+
+class LruTtlCache:
+    """Bounded in-memory LRU with per-entry expiry and an optional disk tier.
+
+    Lookups check memory first and fall back to the store; disk hits are
+    promoted back into memory. Async callers use `aget`/`aset` so SQLite
+    I/O never runs on the event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float, store: SqliteCacheStore | None = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.store = store
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any | None:
+        value = self._recall(key)
+        if value is None and self.store is not None:
+            value = self._promote(key, self._load(key))
+        return self._count(value)
+
+    async def aget(self, key: str) -> Any | None:
+        """Like get, but a disk lookup runs in a worker thread instead of on the event loop."""
+        value = self._recall(key)
+        if value is None and self.store is not None:
+            value = self._promote(key, await asyncio.to_thread(self._load, key))
+        return self._count(value)
+
+    def set(self, key: str, value: Any, ttl_s: float | None = None) -> None:
+        expires_at = time.time() + (self.ttl_s if ttl_s is None else ttl_s)
+        self._remember(key, value, expires_at)
+        if self.store is not None:
+            self._save(key, value, expires_at)
+
+    async def aset(self, key: str, value: Any, ttl_s: float | None = None) -> None:
+        """Like set, but the disk write runs in a worker thread instead of on the event loop."""
+        expires_at = time.time() + (self.ttl_s if ttl_s is None else ttl_s)
+        self._remember(key, value, expires_at)
+        if self.store is not None:
+            await asyncio.to_thread(self._save, key, value, expires_at)
+
+    def _recall(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _promote(self, key: str, stored: tuple[Any, float] | None) -> Any | None:
+        # Only ever called on the event loop thread; _load stays free of shared state
+        if stored is None:
+            return None
+        self._remember(key, *stored)
+        return stored[0]
+
+    def _count(self, value: Any | None) -> Any | None:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _load(self, key: str) -> tuple[Any, float] | None:
+        try:
+            return self.store.get(key)
+        except sqlite3.Error as e:
+            print(f"Cache store read error: {e}")
+            return None
+
+    def _save(self, key: str, value: Any, expires_at: float) -> None:
+        try:
+            self.store.set(key, value, expires_at)
+        except sqlite3.Error as e:
+            print(f"Cache store write error: {e}")
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
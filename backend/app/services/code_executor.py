@@ -1,152 +1,153 @@
-import subprocess
-import sys
+import hashlib
 import json
-import tempfile
-import os
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator
+
+from app.core.config import settings
 from app.models.schemas import CodeExecutionResponse, TestCaseResult
+from app.services.cache import LruTtlCache, SqliteCacheStore
+from app.services.complexity import fit_complexity, fit_space, is_slower_than
+from app.services.problem_registry import Problem, ProblemRegistry
+from app.services.sandbox_pool import SandboxCrashed, SandboxPool, SandboxTimeout
+
+
+def normalize_code(code: str) -> str:
+    # Only edits that can't change behaviour share a cache entry: line endings and
+    # trailing whitespace at the end of the file. Whitespace inside lines can sit in
+    # string literals or continuations, and leading lines shift traceback line numbers.
+    return code.replace("\r\n", "\n").replace("\r", "\n").rstrip()
+
 
 class CodeExecutor:
     def __init__(self):
-        pass
+        self.problems = ProblemRegistry.load(settings.problems_dir)
+        self.pool = SandboxPool(
+            size=settings.sandbox_pool_size,
+            max_jobs=settings.sandbox_max_jobs,
+            timeout=settings.sandbox_timeout_s,
+        )
+        store = None
+        if settings.dojo_cache_persist:
+            store = SqliteCacheStore(Path(settings.data_dir) / "cache.sqlite3", namespace="dojo")
+        self.cache = LruTtlCache(settings.dojo_cache_size, settings.dojo_cache_ttl_s, store)
+
+    async def start(self):
+        await self.pool.start()
+
+    async def close(self):
+        await self.pool.close()
 
-    def execute(self, code: str, language: str, problem_id: str | None) -> CodeExecutionResponse:
+    async def execute(
+        self, code: str, language: str, problem_id: str | None, analyze_complexity: bool = False
+    ) -> CodeExecutionResponse:
+        async with aclosing(self.stream(code, language, problem_id, analyze_complexity)) as events:
+            async for kind, value in events:
+                if kind == "done":
+                    return value
+        return CodeExecutionResponse(results=[], error="System Error: execution ended without a result")
+
+    async def stream(
+        self, code: str, language: str, problem_id: str | None, analyze_complexity: bool = False
+    ) -> AsyncIterator[tuple[str, TestCaseResult | CodeExecutionResponse]]:
+        """Yield ("case", TestCaseResult) as each test finishes, then ("done", CodeExecutionResponse)."""
         if language != "python":
-            return CodeExecutionResponse(results=[], error="Only Python is supported currently.")
+            yield "done", CodeExecutionResponse(results=[], error="Only Python is supported currently.")
+            return
 
-        # Harness for Invert Binary Tree
-        harness = """
-import json
-import sys
-
-# Helper functions for Tree
-def list_to_tree(l):
-    if not l: return None
-    root = TreeNode(l[0])
-    queue = [root]
-    i = 1
-    while i < len(l):
-        node = queue.pop(0)
-        if i < len(l) and l[i] is not None:
-            node.left = TreeNode(l[i])
-            queue.append(node.left)
-        i += 1
-        if i < len(l) and l[i] is not None:
-            node.right = TreeNode(l[i])
-            queue.append(node.right)
-        i += 1
-    return root
-
-def tree_to_list(root):
-    if not root: return []
-    result = []
-    queue = [root]
-    while queue:
-        node = queue.pop(0)
-        if node:
-            result.append(node.val)
-            queue.append(node.left)
-            queue.append(node.right)
-        else:
-            result.append(None)
-    # Trim trailing Nones
-    while result and result[-1] is None:
-        result.pop()
-    return result
-
-test_cases = [
-    {"id": 1, "input": [4,2,7,1,3,6,9], "expected": [4,7,2,9,6,3,1]},
-    {"id": 2, "input": [2,1,3], "expected": [2,3,1]},
-    {"id": 3, "input": [], "expected": []}
-]
-
-results = []
-try:
-    for tc in test_cases:
         try:
-            root = list_to_tree(tc["input"])
-            # User code must define invertTree
-            inverted = invertTree(root)
-            actual = tree_to_list(inverted)
-            passed = actual == tc["expected"]
-            results.append({
-                "id": tc["id"],
-                "input": str(tc["input"]),
-                "expected": str(tc["expected"]),
-                "actual": str(actual),
-                "passed": passed,
-                "error": None
-            })
-        except Exception as e:
-            results.append({
-                "id": tc["id"],
-                "input": str(tc["input"]),
-                "expected": str(tc["expected"]),
-                "actual": "Error",
-                "passed": False,
-                "error": str(e)
-            })
-    print("---JSON_START---")
-    print(json.dumps(results))
-    print("---JSON_END---")
-except Exception as e:
-    print(f"Harness Error: {e}", file=sys.stderr)
-"""
-        
-        full_code = code + "\n" + harness
+            problem = self.problems.get(problem_id)
+        except KeyError:
+            yield "done", CodeExecutionResponse(results=[], error=f"Unknown problem: {problem_id}")
+            return
+
+        cache_key = self._cache_key(code, language, problem, analyze_complexity)
+        cached = await self.cache.aget(cache_key)
+        if cached is not None:
+            response = CodeExecutionResponse(**cached)
+            for result in response.results:
+                yield "case", result
+            yield "done", response
+            return
+
+        results: list[TestCaseResult] = []
+        samples: list[dict] = []
+        analyze_s = settings.complexity_budget_s if analyze_complexity and problem.scalable else 0.0
 
         try:
-            # Write to temp file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(full_code)
-                temp_path = f.name
-
-            # Execute
-            process = subprocess.run(
-                [sys.executable, temp_path],
-                capture_output=True,
-                text=True,
-                timeout=5
+            # Run in a warm sandbox worker; code goes over the pipe, not to disk
+            async with aclosing(self.pool.stream(code, problem.bundle, analyze_s)) as messages:
+                async for message in messages:
+                    if message.get("type") == "case":
+                        result = TestCaseResult(**message["case"])
+                        results.append(result)
+                        yield "case", result
+                    elif message.get("type") == "sample":
+                        samples.append(message["sample"])
+                    elif message.get("type") == "done":
+                        reply = message
+        except SandboxTimeout:
+            yield "done", CodeExecutionResponse(results=results, error=f"Execution Timed Out ({self.pool.timeout:g}s limit)")
+            return
+        except SandboxCrashed as e:
+            yield "done", CodeExecutionResponse(results=results, error=f"Runtime Error:\n{e}")
+            return
+        except Exception as e:
+            yield "done", CodeExecutionResponse(results=results, error=f"System Error: {str(e)}")
+            return
+
+        stdout = reply["stdout"]
+        stderr = reply["stderr"]
+
+        if not reply["ok"]:
+            response = CodeExecutionResponse(
+                results=results,
+                output=stdout,
+                error=f"Runtime Error:\n{stderr}"
+            )
+        elif results:
+            response = CodeExecutionResponse(
+                results=results,
+                output=stdout, # User print output
+                complexity=self._summarize(results, samples, problem),
+                scaling=samples or None,
+            )
+        else:
+            response = CodeExecutionResponse(
+                results=[],
+                output=stdout,
+                error=f"No test results were reported. Did you define {problem.entrypoint} correctly?"
             )
 
-            os.unlink(temp_path)
-
-            stdout = process.stdout
-            stderr = process.stderr
-
-            if process.returncode != 0:
-                return CodeExecutionResponse(
-                    results=[],
-                    output=stdout,
-                    error=f"Runtime Error:\n{stderr}"
-                )
-
-            # Parse results
-            if "---JSON_START---" in stdout:
-                json_str = stdout.split("---JSON_START---")[1].split("---JSON_END---")[0]
-                results_data = json.loads(json_str)
-                results = [TestCaseResult(**r) for r in results_data]
-                
-                # Calculate complexity (Mock for now, or simple analysis)
-                complexity = {
-                    "time": "O(n)",
-                    "space": "O(n)",
-                    "memory": "14.5 MB",
-                    "runtime": "35 ms"
-                }
-                
-                return CodeExecutionResponse(
-                    results=results,
-                    output=stdout.split("---JSON_START---")[0], # User print output
-                    complexity=complexity
-                )
-            else:
-                return CodeExecutionResponse(
-                    results=[],
-                    output=stdout,
-                    error="Could not parse test results. Did you define invertTree correctly?"
-                )
-
-        except subprocess.TimeoutExpired:
-            return CodeExecutionResponse(results=[], error="Execution Timed Out (5s limit)")
-        except Exception as e:
-            return CodeExecutionResponse(results=[], error=f"System Error: {str(e)}")
+        # Only completed runs are cached; timeouts and sandbox failures can be load-dependent
+        await self.cache.aset(cache_key, response.model_dump())
+        yield "done", response
+
+    def _cache_key(self, code: str, language: str, problem: Problem, analyze_complexity: bool) -> str:
+        # bundle.key carries the problem id and test-set version
+        material = json.dumps([normalize_code(code), language, problem.bundle.key, analyze_complexity])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _summarize(self, results: list[TestCaseResult], samples: list[dict], problem: Problem) -> dict[str, str]:
+        runtime_ms = sum(r.runtime_ms or 0.0 for r in results)
+        cpu_ms = sum(r.cpu_ms or 0.0 for r in results)
+        memory_kb = max((r.memory_kb or 0 for r in results), default=0)
+
+        time_class = fit_complexity([(s["n"], s["runtime_ms"]) for s in samples])
+        space_class = fit_space([(s["n"], s["alloc_bytes"]) for s in samples])
+
+        complexity = {
+            "time": time_class or "n/a",
+            "space": space_class or "n/a",
+            "runtime": f"{runtime_ms:.2f} ms",
+            "cpu": f"{cpu_ms:.2f} ms",
+            "memory": f"{memory_kb / 1024:.1f} MB" if memory_kb else "n/a",
+        }
+        if problem.expected_complexity:
+            complexity["expected"] = problem.expected_complexity
+        if is_slower_than(time_class, problem.expected_complexity):
+            complexity["warning"] = (
+                f"Scales as {time_class}, slower than the expected {problem.expected_complexity}; "
+                "likely to time out on large inputs."
+            )
+        return complexity
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import math
+from typing import Callable
+
+# Candidate growth classes, cheapest first
+COMPLEXITY_CLASSES: list[tuple[str, Callable[[int], float]]] = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n^2)", lambda n: float(n) ** 2),
+    ("O(n^3)", lambda n: float(n) ** 3),
+]
+
+# Neighbouring classes (n vs n log n) are hard to separate with cache effects
+# and timer noise, so a cheaper class wins unless it fits clearly worse
+FIT_TOLERANCE = 3.0
+
+# Allocation peaks below this are treated as constant extra space
+CONSTANT_SPACE_BYTES = 16 * 1024
+
+
+def fit_complexity(samples: list[tuple[int, float]]) -> str | None:
+    """Pick the growth class whose best-fit curve c*f(n) tracks the samples most closely.
+
+    Errors are measured relative to each observation so the largest input
+    doesn't dominate the fit. Returns None when there are too few usable points.
+    """
+    points = [(n, y) for n, y in samples if n > 1 and y > 0]
+    if len(points) < 3:
+        return None
+
+    errors = []
+    for label, growth in COMPLEXITY_CLASSES:
+        ratios = [growth(n) / y for n, y in points]
+        scale = sum(ratios) / sum(r * r for r in ratios)
+        errors.append((label, sum((scale * r - 1.0) ** 2 for r in ratios)))
+
+    best_error = min(error for _, error in errors)
+    for label, error in errors:
+        if error <= best_error * FIT_TOLERANCE + 0.02:
+            return label
+    return None
+
+
+def fit_space(samples: list[tuple[int, float]]) -> str | None:
+    if len(samples) < 3:
+        return None
+    if max(y for _, y in samples) < CONSTANT_SPACE_BYTES:
+        return "O(1)"
+    return fit_complexity(samples)
+
+
+def is_slower_than(label: str | None, expected: str | None) -> bool:
+    order = [name for name, _ in COMPLEXITY_CLASSES]
+    if label not in order or expected not in order:
+        return False
+    return order.index(label) > order.index(expected)
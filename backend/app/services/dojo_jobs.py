@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from contextlib import aclosing, suppress
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from app.models.schemas import CodeExecutionJob, CodeExecutionResponse, TestCaseResult
+from app.services.code_executor import CodeExecutor
+
+TERMINAL_EVENTS = {"done", "cancelled"}
+
+
+@dataclass
+class DojoJob:
+    job_id: str
+    status: str = "queued"
+    results: list[TestCaseResult] = field(default_factory=list)
+    response: CodeExecutionResponse | None = None
+    events: list[dict] = field(default_factory=list)
+    subscribers: set[asyncio.Queue] = field(default_factory=set)
+    task: asyncio.Task | None = None
+    finished_at: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in {"completed", "cancelled"}
+
+    def snapshot(self) -> CodeExecutionJob:
+        return CodeExecutionJob(
+            job_id=self.job_id,
+            status=self.status,
+            results=self.results,
+            response=self.response,
+        )
+
+
+class DojoJobQueue:
+    """Background Dojo runs that clients poll, stream or cancel by job id.
+
+    Every event a job produces is kept on the job, so a subscriber that
+    connects late still receives the full sequence from the first test case.
+    Finished jobs are dropped after `retention_s`.
+    """
+
+    def __init__(self, executor: CodeExecutor, retention_s: float = 600.0) -> None:
+        self._executor = executor
+        self._retention_s = retention_s
+        self._jobs: dict[str, DojoJob] = {}
+
+    def submit(self, code: str, language: str, problem_id: str | None, analyze_complexity: bool = False) -> DojoJob:
+        self._prune()
+        job = DojoJob(job_id=str(uuid.uuid4()))
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, code, language, problem_id, analyze_complexity))
+        return job
+
+    def get(self, job_id: str) -> DojoJob:
+        if job_id not in self._jobs:
+            raise KeyError("Unknown job")
+        return self._jobs[job_id]
+
+    async def cancel(self, job_id: str) -> DojoJob:
+        job = self.get(job_id)
+        if not job.finished and job.task is not None:
+            job.task.cancel()
+            # _run absorbs the cancellation once it has started; a task cancelled
+            # before its first step re-raises it here instead
+            with suppress(asyncio.CancelledError):
+                await job.task
+            if not job.finished:
+                self._mark_cancelled(job)
+        return job
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[dict]:
+        job = self.get(job_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in job.events:
+            queue.put_nowait(event)
+        job.subscribers.add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            job.subscribers.discard(queue)
+
+    async def _run(
+        self, job: DojoJob, code: str, language: str, problem_id: str | None, analyze_complexity: bool
+    ) -> None:
+        job.status = "running"
+        self._publish(job, {"type": "status", "payload": {"status": job.status}})
+        try:
+            async with aclosing(self._executor.stream(code, language, problem_id, analyze_complexity)) as events:
+                async for kind, value in events:
+                    if kind == "case":
+                        job.results.append(value)
+                        self._publish(job, {"type": "case", "payload": value.model_dump()})
+                    else:
+                        job.response = value
+                        job.status = "completed"
+                        self._publish(job, {"type": "done", "payload": value.model_dump()})
+        except asyncio.CancelledError:
+            self._mark_cancelled(job)
+        finally:
+            job.finished_at = time.monotonic()
+
+    def _mark_cancelled(self, job: DojoJob) -> None:
+        job.status = "cancelled"
+        job.finished_at = time.monotonic()
+        self._publish(job, {"type": "cancelled", "payload": {"job_id": job.job_id}})
+
+    def _publish(self, job: DojoJob, event: dict) -> None:
+        job.events.append(event)
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self._retention_s
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.models.schemas import InterviewQuestion
+from app.services.llm_agent import LlmAgent
+
+
+class EvaluationBatcher:
+    """Coalesce answer evaluations from concurrent sessions into shared LLM calls.
+
+    The first request opens a `window_ms` collection window; everything that
+    arrives before it closes (or until `max_batch` items are waiting) goes out
+    as one multi-item prompt, so a burst of N answers costs one rate-limit
+    token instead of N. A lone request is sent as a normal evaluation.
+    """
+
+    def __init__(self, llm_agent: LlmAgent, max_batch: int = 8, window_ms: float = 20.0) -> None:
+        self._llm = llm_agent
+        self.max_batch = max(1, max_batch)
+        self.window_s = max(0.0, window_ms) / 1000
+        self._pending: list[tuple[InterviewQuestion, str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def evaluate(self, question: InterviewQuestion, answer: str) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((question, answer, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        # Shielded so one cancelled caller doesn't cancel the batch call for everyone
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[InterviewQuestion, str, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                question, answer, _ = batch[0]
+                results = [await self._llm.evaluate_answer(question, answer)]
+            else:
+                results = await self._llm.evaluate_answers_batch([(q, a) for q, a, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
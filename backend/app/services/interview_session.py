@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+
+from app.models.schemas import InterviewQuestion
+from app.services.telemetry_buffer import TelemetryBuffer
+from app.services.vision_engine import VisionState
+
+
+class QuestionQueue:
+    """Questions for one session, filled by a background generation task.
+
+    Readers get what has already streamed in without waiting; `get` only
+    blocks when the candidate has caught up with the generator.
+    """
+
+    def __init__(self, items: list[InterviewQuestion] | None = None, closed: bool = False) -> None:
+        self._items: list[InterviewQuestion] = list(items or [])
+        self.closed = closed
+        self._waiters: list[asyncio.Future] = []
+        self.task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, idx: int) -> InterviewQuestion:
+        return self._items[idx]
+
+    def put(self, question: InterviewQuestion) -> None:
+        self._items.append(question)
+        self._wake()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    async def get(self, idx: int) -> InterviewQuestion | None:
+        """The question at `idx`, or None once generation has ended without one."""
+        while idx >= len(self._items) and not self.closed:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        return self._items[idx] if idx < len(self._items) else None
+
+    def cancel(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+    def _wake(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+@dataclass
+class InterviewSession:
+    """One interview's state, changed only through `apply` so it can be rebuilt from its log.
+
+    Log records are small dicts with an "op" key; `seq` counts the records
+    applied so far, letting replay skip records a snapshot already covers.
+    Raw telemetry frames are the exception: they only enter the in-memory
+    ring buffer and reach the log as "telemetry_window" aggregates.
+    """
+
+    session_id: str
+    questions: QuestionQueue
+    # What the questions were generated from; needed to resume generation after a restart
+    spec: dict = field(default_factory=dict)
+    idx: int = 0
+    events: list[dict] = field(default_factory=list)
+    # Compact stand-ins for `events` that the final report prompt is built from
+    summary: str = ""
+    telemetry: TelemetryBuffer = field(default_factory=TelemetryBuffer)
+    # Derived from `telemetry` and never persisted; rebuilt from the ring after a restore
+    vision: VisionState = field(default_factory=VisionState)
+    seq: int = 0
+    summary_task: asyncio.Task | None = None
+
+    @property
+    def current_question(self) -> InterviewQuestion:
+        return self.questions[self.idx]
+
+    @property
+    def busy(self) -> bool:
+        return any(task is not None and not task.done() for task in (self.questions.task, self.summary_task))
+
+    def apply(self, record: dict) -> None:
+        op = record["op"]
+        if op == "question":
+            self.questions.put(InterviewQuestion(**record["question"]))
+        elif op == "questions_closed":
+            self.questions.close()
+        elif op == "event":
+            self.events.append(record["event"])
+        elif op == "telemetry_window":
+            self.telemetry.add_window(record["window"])
+        elif op == "advance":
+            self.idx += 1
+        elif op == "summary":
+            self.summary = record["summary"]
+        else:
+            raise ValueError(f"Unknown session op {op!r}")
+        self.seq += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "spec": self.spec,
+            "questions": [q.model_dump() for q in self.questions],
+            "questions_closed": self.questions.closed,
+            "idx": self.idx,
+            "events": self.events,
+            "summary": self.summary,
+            "telemetry": self.telemetry.to_dict(),
+            "seq": self.seq,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "InterviewSession":
+        return cls(
+            session_id=data["session_id"],
+            questions=QuestionQueue(
+                [InterviewQuestion(**q) for q in data["questions"]],
+                closed=data["questions_closed"],
+            ),
+            spec=data.get("spec", {}),
+            idx=data["idx"],
+            events=data["events"],
+            summary=data["summary"],
+            telemetry=TelemetryBuffer.from_dict(data["telemetry"]),
+            seq=data["seq"],
+        )
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class IncrementalJsonObjectParser:
+    """Emit the top-level members of a streamed JSON object as each one completes.
+
+    Every character is scanned once, so feeding a response token by token
+    costs O(total length). Anything before the first "{" (for example a
+    ```json fence) is skipped. Values are decoded with json.loads once their
+    text is complete.
+    """
+
+    def __init__(self) -> None:
+        self._started = False
+        self._finished = False
+        self._buffer: list[str] = []
+        self._key: str | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.result: dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        """Consume `chunk` and return the members completed by it."""
+        completed: dict[str, Any] = {}
+        for ch in chunk:
+            if self._finished:
+                break
+            if not self._started:
+                self._started = ch == "{"
+                continue
+
+            if self._in_string:
+                self._buffer.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._buffer.append(ch)
+            elif ch in "[{":
+                self._depth += 1
+                self._buffer.append(ch)
+            elif ch in "]}" and self._depth > 0:
+                self._depth -= 1
+                self._buffer.append(ch)
+            elif ch == ":" and self._depth == 0 and self._key is None:
+                try:
+                    self._key = self._take_json()
+                except ValueError:
+                    self._key = None
+            elif ch in ",}" and self._depth == 0:
+                if self._key is not None:
+                    try:
+                        value = self._take_json()
+                    except ValueError:
+                        pass
+                    else:
+                        completed[self._key] = value
+                        self.result[self._key] = value
+                self._key = None
+                self._buffer.clear()
+                self._finished = ch == "}"
+            else:
+                self._buffer.append(ch)
+        return completed
+
+    def _take_json(self) -> Any:
+        text = "".join(self._buffer).strip()
+        self._buffer.clear()
+        return json.loads(text)
+
+
+class IncrementalJsonArrayParser:
+    """Emit the elements of the first JSON array in a stream as each one completes.
+
+    Suited to replies shaped like {"questions": ["...", "..."]}: text before
+    the first "[" is skipped and elements are decoded as soon as the "," or
+    "]" after them arrives. Linear in the total length, like the object parser.
+    """
+
+    def __init__(self) -> None:
+        self._started = False
+        self._finished = False
+        self._buffer: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.items: list[Any] = []
+
+    def feed(self, chunk: str) -> list[Any]:
+        """Consume `chunk` and return the elements completed by it."""
+        completed: list[Any] = []
+        for ch in chunk:
+            if self._finished:
+                break
+            if not self._started:
+                self._started = ch == "["
+                continue
+
+            if self._in_string:
+                self._buffer.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._buffer.append(ch)
+            elif ch in "[{":
+                self._depth += 1
+                self._buffer.append(ch)
+            elif ch in "]}" and self._depth > 0:
+                self._depth -= 1
+                self._buffer.append(ch)
+            elif ch in ",]" and self._depth == 0:
+                text = "".join(self._buffer).strip()
+                self._buffer.clear()
+                if text:
+                    try:
+                        value = json.loads(text)
+                    except ValueError:
+                        pass
+                    else:
+                        completed.append(value)
+                        self.items.append(value)
+                self._finished = ch == "]"
+            else:
+                self._buffer.append(ch)
+        return completed
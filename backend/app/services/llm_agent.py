@@ -1,25 +1,65 @@
 from __future__ import annotations
 
-from langchain_groq import ChatGroq
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator
+
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
 from app.core.config import settings
 from app.models.schemas import InterviewQuestion
+from app.services.cache import LruTtlCache, SqliteCacheStore
+from app.services.json_stream import IncrementalJsonObjectParser
+from app.services.llm_gateway import LlmGateway, Priority
 
+# How long a cached response stays valid, per call type
+CACHE_TTLS = {
+    "evaluate_answer": 7 * 24 * 3600,
+    "evaluate_answers_batch": 7 * 24 * 3600,
+    "session_summary": 24 * 3600,
+    "final_report": 24 * 3600,
+    "company_intel": 6 * 3600,
+}
 
-class LlmAgent:
-    def __init__(self) -> None:
-        self.llm = ChatGroq(
-            api_key=settings.groq_api_key,
-            model_name=settings.groq_model,
-            temperature=0.3,
-        )
+# Live-interview calls are admitted ahead of everything else at the gateway
+CALL_PRIORITIES = {
+    "evaluate_answer": Priority.INTERVIEW,
+    "evaluate_answers_batch": Priority.INTERVIEW,
+    "session_summary": Priority.INTERVIEW,
+    "final_report": Priority.INTERVIEW,
+    "company_intel": Priority.BACKGROUND,
+}
 
-    async def evaluate_answer(self, question: InterviewQuestion, answer: str) -> dict:
-        parser = JsonOutputParser()
-        prompt = ChatPromptTemplate.from_template(
-            """
+# Returned when the company analysis fails; callers compare against it to avoid caching it
+COMPANY_INTEL_FALLBACK = {
+    "techStack": ["Unknown"],
+    "values": ["Unknown"],
+    "topics": [],
+    "tips": ["Research the company website."],
+    "news": [],
+}
+
+# Caps that keep the summary and final-report prompts a fixed size
+SUMMARY_MAX_CHARS = 1500
+SUMMARY_ANSWER_CHARS = 1200
+
+
+def _template(body: str) -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_template(body).partial(
+        format_instructions=JsonOutputParser().get_format_instructions()
+    )
+
+
+class LlmAgent:
+    # Compiled once at import instead of on every call
+    EVALUATE_PROMPT = _template(
+        """
             You are an expert technical interviewer. Evaluate the candidate's answer to the following question.
             
             Question ({kind}): {question_text}
@@ -34,39 +74,54 @@ class LlmAgent:
             
             {format_instructions}
             """
-        )
-        
-        chain = prompt | self.llm | parser
-        
-        try:
-            result = await chain.ainvoke({
-                "kind": question.kind,
-                "question_text": question.prompt,
-                "context": question.context or "N/A",
-                "answer": answer,
-                "format_instructions": parser.get_format_instructions(),
-            })
-            return result
-        except Exception as e:
-            print(f"Error evaluating answer: {e}")
-            # Fallback to stub
-            score = 0.5
-            if len(answer.strip()) >= 40:
-                score = 0.65
-            return {
-                "technical_accuracy": score if question.kind == "technical" else 0.6,
-                "clarity": min(1.0, max(0.0, 0.4 + 0.01 * len(answer.split()))),
-                "notes": ["Error calling LLM, using fallback scoring."],
-            }
-
-    async def generate_final_report(self, history: list[dict]) -> dict:
-        parser = JsonOutputParser()
-        prompt = ChatPromptTemplate.from_template(
+    )
+    BATCH_EVALUATE_PROMPT = _template(
+        """
+            You are an expert technical interviewer. Evaluate each candidate answer below independently.
+            The answers come from different interviews; do not let one influence another.
+            
+            {items}
+            
+            Provide a JSON response with a single key "evaluations": a list with one object per item, each with:
+            - id: int (the item number)
+            - technical_accuracy: float (0.0 to 1.0)
+            - clarity: float (0.0 to 1.0)
+            - notes: list[str] (constructive feedback)
+            
+            {format_instructions}
+            """
+    )
+    SUMMARY_PROMPT = _template(
+        """
+            You are an expert interview coach keeping running notes on a mock interview.
+            
+            Notes so far:
+            {summary}
+            
+            Latest exchange:
+            Question ({kind}): {question_text}
+            Candidate Answer: {answer}
+            Scores: technical_accuracy={technical_accuracy}, clarity={clarity}, confidence={confidence}
+            Feedback: {notes}
+            
+            Rewrite the notes to fold in the latest exchange. Keep recurring strengths, weaknesses, verbal habits and
+            missed topics; drop detail that no longer matters. Stay under {max_words} words.
+            
+            Provide a JSON response with the following keys:
+            - summary: str (the updated notes)
+            
+            {format_instructions}
             """
-            You are an expert interview coach. Review the following interview session history and generate a comprehensive performance report.
+    )
+    REPORT_PROMPT = _template(
+        """
+            You are an expert interview coach. Review the following interview notes and session statistics and generate a comprehensive performance report.
             
-            Session History:
-            {history}
+            Interview Notes:
+            {summary}
+            
+            Session Statistics:
+            {stats}
             
             Provide a JSON response with the following keys:
             - areas_of_improvement: list[str] (3-5 key areas to work on)
@@ -76,29 +131,9 @@ class LlmAgent:
             
             {format_instructions}
             """
-        )
-        
-        chain = prompt | self.llm | parser
-        
-        try:
-            result = await chain.ainvoke({
-                "history": str(history),
-                "format_instructions": parser.get_format_instructions(),
-            })
-            return result
-        except Exception as e:
-            print(f"Error generating report: {e}")
-            return {
-                "areas_of_improvement": ["Practice more"],
-                "mistakes": ["Could not analyze"],
-                "tips": ["Keep trying"],
-                "attitude_score": 0.8
-            }
-
-    async def analyze_company_intel(self, company: str, context: dict) -> dict:
-        parser = JsonOutputParser()
-        prompt = ChatPromptTemplate.from_template(
-            """
+    )
+    COMPANY_INTEL_PROMPT = _template(
+        """
             You are a corporate intelligence analyst. Analyze the provided search results for {company} and extract key information for a job candidate.
             
             Search Context:
@@ -124,27 +159,225 @@ class LlmAgent:
             
             {format_instructions}
             """
+    )
+
+    def __init__(self, gateway: LlmGateway) -> None:
+        self.gateway = gateway
+        self.llm = gateway.chat(temperature=0.3)
+        self.parser = JsonOutputParser()
+        self.cache = LruTtlCache(settings.llm_cache_size, ttl_s=max(CACHE_TTLS.values()), store=self._open_store())
+
+    @staticmethod
+    def _open_store() -> SqliteCacheStore | None:
+        if not settings.llm_cache_persist:
+            return None
+        try:
+            return SqliteCacheStore(Path(settings.data_dir) / "cache.sqlite3", namespace="llm")
+        except (OSError, sqlite3.Error) as e:
+            print(f"LLM cache store unavailable, using memory only: {e}")
+            return None
+
+    def _cache_key(self, call_type: str, messages: list) -> str:
+        rendered = json.dumps(
+            [settings.groq_model, getattr(self.llm, "temperature", None), call_type, [(m.type, m.content) for m in messages]]
         )
-        
-        chain = prompt | self.llm | parser
-        
+        return hashlib.sha256(rendered.encode()).hexdigest()
+
+    async def _invoke_json(self, call_type: str, prompt: ChatPromptTemplate, variables: dict) -> dict:
+        messages = prompt.format_messages(**variables)
+        key = self._cache_key(call_type, messages)
+
+        # Copies keep callers that decorate the result from mutating the cached entry
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        async with self.gateway.slot(CALL_PRIORITIES[call_type]):
+            message = await self.llm.ainvoke(messages)
+        result = self.parser.parse(message.content)
+        await self.cache.aset(key, copy.deepcopy(result), ttl_s=CACHE_TTLS[call_type])
+        return result
+
+    async def _stream_json(
+        self, call_type: str, prompt: ChatPromptTemplate, variables: dict
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """Like _invoke_json, but yields ("delta", fields) as top-level keys complete, then ("result", dict)."""
+        messages = prompt.format_messages(**variables)
+        key = self._cache_key(call_type, messages)
+
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            yield "result", copy.deepcopy(cached)
+            return
+
+        stream_parser = IncrementalJsonObjectParser()
+        chunks: list[str] = []
+        async with self.gateway.slot(CALL_PRIORITIES[call_type]):
+            async for chunk in self.llm.astream(messages):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                chunks.append(text)
+                delta = stream_parser.feed(text)
+                if delta:
+                    yield "delta", delta
+
+        # The full parser tolerates output the incremental one may have skipped
         try:
-            result = await chain.ainvoke({
+            result = self.parser.parse("".join(chunks))
+        except Exception:
+            if not stream_parser.result:
+                raise
+            result = stream_parser.result
+        await self.cache.aset(key, copy.deepcopy(result), ttl_s=CACHE_TTLS[call_type])
+        yield "result", result
+
+    async def evaluate_answer(self, question: InterviewQuestion, answer: str) -> dict:
+        async with aclosing(self.stream_evaluate_answer(question, answer)) as events:
+            async for kind, value in events:
+                if kind == "result":
+                    return value
+
+    async def stream_evaluate_answer(self, question: InterviewQuestion, answer: str) -> AsyncIterator[tuple[str, dict]]:
+        """Yield ("delta", fields) while the evaluation streams in, then ("result", evaluation)."""
+        try:
+            async for kind, value in self._stream_json("evaluate_answer", self.EVALUATE_PROMPT, self._evaluation_variables(question, answer)):
+                yield kind, value
+        except Exception as e:
+            print(f"Error evaluating answer: {e}")
+            yield "result", self._fallback_evaluation(question, answer)
+
+    async def evaluate_answers_batch(self, items: list[tuple[InterviewQuestion, str]]) -> list[dict]:
+        """Evaluate several (question, answer) pairs with one LLM call.
+
+        Each item is looked up and stored under the same cache key a single
+        evaluate_answer call would use, so batched and unbatched paths share
+        results. Items missing from the batch reply fall back individually.
+        """
+        results: list[dict | None] = [None] * len(items)
+        keys = [
+            self._cache_key("evaluate_answer", self.EVALUATE_PROMPT.format_messages(**self._evaluation_variables(q, a)))
+            for q, a in items
+        ]
+        misses = []
+        for i, key in enumerate(keys):
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                results[i] = copy.deepcopy(cached)
+            else:
+                misses.append(i)
+
+        if len(misses) == 1:
+            i = misses[0]
+            results[i] = await self.evaluate_answer(*items[i])
+        elif misses:
+            blocks = []
+            for n, i in enumerate(misses, start=1):
+                question, answer = items[i]
+                variables = self._evaluation_variables(question, answer)
+                blocks.append(
+                    f"Item {n}\nQuestion ({variables['kind']}): {variables['question_text']}\n"
+                    f"Context: {variables['context']}\nCandidate Answer: {variables['answer']}"
+                )
+            try:
+                reply = await self._invoke_json(
+                    "evaluate_answers_batch", self.BATCH_EVALUATE_PROMPT, {"items": "\n\n".join(blocks)}
+                )
+                by_id = {int(e["id"]): e for e in reply.get("evaluations", []) if isinstance(e, dict) and "id" in e}
+            except Exception as e:
+                print(f"Error evaluating answer batch: {e}")
+                by_id = {}
+
+            retry = []
+            for n, i in enumerate(misses, start=1):
+                evaluation = by_id.get(n)
+                if evaluation is None:
+                    retry.append(i)
+                    continue
+                evaluation = {k: evaluation[k] for k in ("technical_accuracy", "clarity", "notes") if k in evaluation}
+                await self.cache.aset(keys[i], copy.deepcopy(evaluation), ttl_s=CACHE_TTLS["evaluate_answer"])
+                results[i] = evaluation
+
+            for i, evaluation in zip(retry, await asyncio.gather(*(self.evaluate_answer(*items[i]) for i in retry))):
+                results[i] = evaluation
+
+        return results
+
+    @staticmethod
+    def _evaluation_variables(question: InterviewQuestion, answer: str) -> dict:
+        return {
+            "kind": question.kind,
+            "question_text": question.prompt,
+            "context": question.context or "N/A",
+            "answer": answer,
+        }
+
+    @staticmethod
+    def _fallback_evaluation(question: InterviewQuestion, answer: str) -> dict:
+        # Fallback to stub
+        score = 0.5
+        if len(answer.strip()) >= 40:
+            score = 0.65
+        return {
+            "technical_accuracy": score if question.kind == "technical" else 0.6,
+            "clarity": min(1.0, max(0.0, 0.4 + 0.01 * len(answer.split()))),
+            "notes": ["Error calling LLM, using fallback scoring."],
+        }
+
+    async def update_session_summary(self, summary: str, question: InterviewQuestion, answer: str, feedback: dict) -> str:
+        """Fold one answered question into the session's rolling summary."""
+        try:
+            result = await self._invoke_json("session_summary", self.SUMMARY_PROMPT, {
+                "summary": summary or "(none yet)",
+                "kind": question.kind,
+                "question_text": question.prompt,
+                "answer": answer[:SUMMARY_ANSWER_CHARS],
+                "technical_accuracy": round(float(feedback.get("technical_accuracy", 0.0)), 2),
+                "clarity": round(float(feedback.get("clarity", 0.0)), 2),
+                "confidence": round(float(feedback.get("confidence", 0.0)), 2),
+                "notes": "; ".join(feedback.get("notes") or []) or "None",
+                "max_words": SUMMARY_MAX_CHARS // 6,
+            })
+            updated = str(result["summary"]).strip()
+        except Exception as e:
+            print(f"Error updating session summary: {e}")
+            # Fallback: one line per answer, oldest lines dropped first
+            notes = "; ".join(feedback.get("notes") or [])
+            line = (
+                f"- {question.kind} question \"{question.prompt[:80]}\": technical "
+                f"{float(feedback.get('technical_accuracy', 0.0)):.2f}, clarity {float(feedback.get('clarity', 0.0)):.2f}"
+                + (f"; {notes}" if notes else "")
+            )
+            updated = f"{summary}\n{line}".strip()
+            while len(updated) > SUMMARY_MAX_CHARS and "\n" in updated:
+                updated = updated.split("\n", 1)[1]
+        return updated[:SUMMARY_MAX_CHARS]
+
+    async def generate_final_report(self, summary: str, stats: dict) -> dict:
+        try:
+            result = await self._invoke_json("final_report", self.REPORT_PROMPT, {
+                "summary": summary or "No answers were submitted.",
+                "stats": json.dumps(stats, sort_keys=True),
+            })
+            return result
+        except Exception as e:
+            print(f"Error generating report: {e}")
+            return {
+                "areas_of_improvement": ["Practice more"],
+                "mistakes": ["Could not analyze"],
+                "tips": ["Keep trying"],
+                "attitude_score": 0.8
+            }
+
+    async def analyze_company_intel(self, company: str, context: dict) -> dict:
+        try:
+            result = await self._invoke_json("company_intel", self.COMPANY_INTEL_PROMPT, {
                 "company": company,
                 "tech_stack": context.get("tech_stack", ""),
                 "values": context.get("values", ""),
                 "interview": context.get("interview", ""),
                 "news": context.get("news", ""),
                 "sentiment": context.get("sentiment", ""),
-                "format_instructions": parser.get_format_instructions(),
             })
             return result
         except Exception as e:
             print(f"Error analyzing company intel: {e}")
-            return {
-                "techStack": ["Unknown"],
-                "values": ["Unknown"],
-                "topics": [],
-                "tips": ["Research the company website."],
-                "news": []
-            }
+            return copy.deepcopy(COMPANY_INTEL_FALLBACK)
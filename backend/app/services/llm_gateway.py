@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator
+
+import httpx
+from langchain_groq import ChatGroq
+
+from app.core.config import settings
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+
+    INTERVIEW = 0
+    BACKGROUND = 1
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse Groq's reset headers ("7.66s", "2m59.56s", "120ms") or a plain seconds value."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, capacity: float) -> None:
+        self.rate = rate_per_s
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class LlmGateway:
+    """The process-wide entry point for LLM calls.
+
+    All ChatGroq clients share one keep-alive httpx pool. Calls are admitted
+    through `slot(priority)`: at most `max_concurrency` run at once, a local
+    request bucket paces them, and the provider's x-ratelimit-* headers tighten
+    that pacing as the real quota runs low. Background traffic (recon, roadmap)
+    may not dip into the last `reserve_fraction` of the bucket or the reported
+    quota, so live interview calls keep flowing during a recon burst.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: float,
+        reserve_fraction: float = 0.2,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserve_fraction = reserve_fraction
+        self.bucket = TokenBucket(requests_per_minute / 60.0, capacity=max(1.0, requests_per_minute / 6.0))
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            event_hooks={"response": [self._observe_response]},
+        )
+        self._models: dict[float, ChatGroq] = {}
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+        # Provider-reported state
+        self._blocked_until = 0.0
+        self._background_blocked_until = 0.0
+
+    def chat(self, temperature: float) -> ChatGroq:
+        """A ChatGroq bound to the shared connection pool, one per temperature."""
+        if temperature not in self._models:
+            self._models[temperature] = ChatGroq(
+                api_key=settings.groq_api_key,
+                model_name=settings.groq_model,
+                temperature=temperature,
+                http_async_client=self.http_client,
+            )
+        return self._models[temperature]
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.BACKGROUND) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), waiter))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before cancellation: hand the slot back
+                self._release()
+            else:
+                self._waiters = [w for w in self._waiters if w[2] is not waiter]
+                heapq.heapify(self._waiters)
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self.bucket.refill(now)
+        while self._waiters and self._in_flight < self.max_concurrency:
+            priority, _, waiter = self._waiters[0]
+            if waiter.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._admission_delay(priority, now)
+            if delay > 0:
+                self._schedule_wakeup(delay)
+                return
+            heapq.heappop(self._waiters)
+            self.bucket.tokens -= 1
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _admission_delay(self, priority: int, now: float) -> float:
+        blocked_until = self._blocked_until
+        reserve = 0.0
+        if priority != Priority.INTERVIEW:
+            blocked_until = max(blocked_until, self._background_blocked_until)
+            reserve = self.bucket.capacity * self.reserve_fraction
+        return max(blocked_until - now, self.bucket.seconds_until(1.0 + reserve), 0.0)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def _observe_response(self, response: httpx.Response) -> None:
+        headers = response.headers
+        now = time.monotonic()
+
+        if response.status_code == 429:
+            retry_after = parse_duration(headers.get("retry-after")) or 1.0
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+            self.bucket.tokens = min(self.bucket.tokens, 0.0)
+
+        for kind in ("requests", "tokens"):
+            limit = _to_float(headers.get(f"x-ratelimit-limit-{kind}"))
+            remaining = _to_float(headers.get(f"x-ratelimit-remaining-{kind}"))
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is None or reset is None:
+                continue
+            if remaining <= 0:
+                self._blocked_until = max(self._blocked_until, now + reset)
+            elif limit and remaining < limit * self.reserve_fraction:
+                # Quota nearly spent: keep what is left for interviews until it resets
+                self._background_blocked_until = max(self._background_blocked_until, now + reset)
+            if kind == "requests":
+                self.bucket.tokens = min(self.bucket.tokens, remaining)
+
+        self._dispatch()
+
+
+def _to_float(value: str | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
+from contextlib import aclosing
 from datetime import datetime
-from dataclasses import dataclass, field
+from typing import AsyncIterator
 
 from app.models.schemas import (
     InterviewFeedback,
@@ -11,96 +13,190 @@ from app.models.schemas import (
     SubmitAnswerResult,
 )
 from app.services.audio_engine import AudioEngine
+from app.services.eval_batcher import EvaluationBatcher
+from app.services.interview_session import InterviewSession, QuestionQueue
 from app.services.llm_agent import LlmAgent
 from app.services.rag_engine import RagEngine
+from app.services.session_store import MemorySessionStore
 from app.services.vision_engine import VisionEngine
 
 
-@dataclass
-class InterviewSession:
-    session_id: str
-    questions: list[InterviewQuestion]
-    idx: int = 0
-    events: list[dict] = field(default_factory=list)
-
-    @property
-    def current_question(self) -> InterviewQuestion:
-        return self.questions[self.idx]
-
-
 class InterviewOrchestrator:
-    def __init__(self) -> None:
-        self._sessions: dict[str, InterviewSession] = {}
-        self._rag = RagEngine()
+    def __init__(
+        self,
+        llm_agent: LlmAgent,
+        rag: RagEngine,
+        batcher: EvaluationBatcher | None = None,
+        store: MemorySessionStore | None = None,
+    ) -> None:
+        self._store = store or MemorySessionStore()
+        self._rag = rag
         self._vision = VisionEngine()
         self._audio = AudioEngine()
-        self._llm = LlmAgent()
+        self._llm = llm_agent
+        self._batcher = batcher
 
     async def create_session(self, resume_id: str | None, job_description: str, role: str, num_questions: int) -> InterviewSession:
-        session_id = str(uuid.uuid4())
-
-        questions = await self._rag.generate_questions(
-            resume_id=resume_id,
-            job_description=job_description,
-            role=role,
-            num_questions=num_questions,
+        session = InterviewSession(
+            session_id=str(uuid.uuid4()),
+            questions=QuestionQueue(),
+            spec={
+                "resume_id": resume_id,
+                "job_description": job_description,
+                "role": role,
+                "num_questions": num_questions,
+            },
         )
+        await self._store.acreate(session)
+        await self._store.arecord(session, {"op": "event", "event": {"type": "session_created", "role": role}}, durable=True)
+
+        # The rest of the questions keep streaming in while the candidate answers the first
+        self._start_generation(session)
+        if await session.questions.get(0) is None:
+            raise RuntimeError("Question generation produced no questions")
+        return session
 
-        session = InterviewSession(session_id=session_id, questions=questions)
-        self._sessions[session_id] = session
-        session.events.append({"type": "session_created", "role": role})
+    async def get_session(self, session_id: str) -> InterviewSession:
+        session = await self._store.aget(session_id)
+        if not session.questions.closed and session.questions.task is None:
+            # Restored from disk mid-generation: pick up where it stopped
+            self._start_generation(session)
         return session
 
-    def get_session(self, session_id: str) -> InterviewSession:
-        if session_id not in self._sessions:
-            raise KeyError("Unknown session")
-        return self._sessions[session_id]
+    async def close(self) -> None:
+        await self._store.aclose()
+
+    def _start_generation(self, session: InterviewSession) -> None:
+        spec = session.spec
+        remaining = spec["num_questions"] - len(session.questions)
+
+        async def fill() -> None:
+            try:
+                if remaining <= 0:
+                    return
+                async with aclosing(
+                    self._rag.stream_questions(
+                        resume_id=spec["resume_id"],
+                        job_description=spec["job_description"],
+                        role=spec["role"],
+                        num_questions=remaining,
+                    )
+                ) as stream:
+                    async for question in stream:
+                        await self._store.arecord(session, {"op": "question", "question": question.model_dump()})
+            finally:
+                await self._store.arecord(session, {"op": "questions_closed"}, durable=True)
+
+        session.questions.task = asyncio.create_task(fill())
 
     async def submit_answer(self, session_id: str, answer_text: str) -> SubmitAnswerResult:
-        session = self.get_session(session_id)
+        async with aclosing(self.submit_answer_stream(session_id, answer_text)) as events:
+            async for kind, value in events:
+                if kind == "result":
+                    return value
+
+    async def submit_answer_stream(
+        self, session_id: str, answer_text: str
+    ) -> AsyncIterator[tuple[str, dict | SubmitAnswerResult]]:
+        """Yield ("delta", partial feedback) as the evaluation streams, then ("result", SubmitAnswerResult)."""
+        session = await self.get_session(session_id)
         question = session.current_question
 
         audio_stats = self._audio.analyze_transcript(answer_text)
-        llm_eval = await self._llm.evaluate_answer(question=question, answer=answer_text)
+        confidence = min(1.0, max(0.0, 0.5 + 0.5 * (audio_stats.get("fluency", 0.0))))
+        # Confidence is computed locally, so the candidate sees it before the LLM answers
+        yield "delta", {"confidence": confidence}
+
+        llm_eval: dict = {}
+        if self._batcher is not None:
+            # Batched evaluations arrive whole, so there are no partial fields to stream
+            llm_eval = await self._batcher.evaluate(question, answer_text)
+        else:
+            async with aclosing(self._llm.stream_evaluate_answer(question=question, answer=answer_text)) as events:
+                async for kind, value in events:
+                    if kind == "delta":
+                        yield "delta", value
+                    else:
+                        llm_eval = value
 
         feedback = InterviewFeedback(
             technical_accuracy=llm_eval.get("technical_accuracy", 0.5),
             clarity=llm_eval.get("clarity", 0.5),
-            confidence=min(1.0, max(0.0, 0.5 + 0.5 * (audio_stats.get("fluency", 0.0)))),
+            confidence=confidence,
             notes=[
                 *(llm_eval.get("notes") or []),
                 *audio_stats.get("notes", []),
             ],
         )
 
-        session.events.append(
+        await self._store.arecord(
+            session,
             {
-                "type": "answer_submitted",
-                "timestamp": datetime.now().isoformat(),
-                "question_id": question.id,
-                "question": question.model_dump(),
-                "answer": answer_text,
-                "feedback": feedback.model_dump(),
-            }
+                "op": "event",
+                "event": {
+                    "type": "answer_submitted",
+                    "timestamp": datetime.now().isoformat(),
+                    "question_id": question.id,
+                    "question": question.model_dump(),
+                    "answer": answer_text,
+                    "feedback": feedback.model_dump(),
+                },
+            },
         )
+        await self._store.arecord(session, {"op": "advance"}, durable=True)
+        self._schedule_summary_update(session, question, answer_text, feedback.model_dump())
 
-        session.idx += 1
-        if session.idx >= len(session.questions):
+        # Usually already generated; waits only if the candidate outpaced the stream
+        if await session.questions.get(session.idx) is None:
             report = await self._build_report(session)
-            return SubmitAnswerResult(feedback=feedback, next_question=None, report=report)
+            yield "result", SubmitAnswerResult(feedback=feedback, next_question=None, report=report)
+            return
 
-        return SubmitAnswerResult(feedback=feedback, next_question=session.current_question, report=None)
+        yield "result", SubmitAnswerResult(feedback=feedback, next_question=session.current_question, report=None)
 
     async def submit_telemetry(self, session_id: str, telemetry: dict) -> None:
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         vision_stats = self._vision.analyze_telemetry(telemetry)
-        session.events.append({"type": "telemetry", "telemetry": telemetry, "vision": vision_stats})
+        window = session.telemetry.add(
+            telemetry.get("timestamp"),
+            vision_stats.get("gaze_score"),
+            vision_stats.get("posture_score"),
+            vision_stats.get("emotion"),
+        )
+        # Only downsampled windows are logged; raw frames live in the ring buffer
+        if window is not None:
+            await self._store.arecord(session, {"op": "telemetry_window", "window": window})
+            # Analytics run once per window so numpy's per-call overhead is amortized
+            self._vision.update(session.telemetry, session.vision)
+
+    async def submit_telemetry_batch(self, session_id: str, frames: list[tuple[float, float, float, int]]) -> None:
+        """Record already-decoded (timestamp, gaze, posture, emotion code) frames from the binary protocol."""
+        session = await self.get_session(session_id)
+        for frame in frames:
+            window = session.telemetry.add(*frame)
+            if window is not None:
+                await self._store.arecord(session, {"op": "telemetry_window", "window": window})
+        self._vision.update(session.telemetry, session.vision)
 
     async def end_session(self, session_id: str) -> InterviewReport:
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         return await self._build_report(session)
 
+    def _schedule_summary_update(self, session: InterviewSession, question: InterviewQuestion, answer: str, feedback: dict) -> None:
+        # Each update waits for the previous one so answers are folded in order
+        previous = session.summary_task
+
+        async def update() -> None:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            summary = await self._llm.update_session_summary(session.summary, question, answer, feedback)
+            await self._store.arecord(session, {"op": "summary", "summary": summary}, durable=True)
+
+        session.summary_task = asyncio.create_task(update())
+
     async def _build_report(self, session: InterviewSession) -> InterviewReport:
+        # Ending early: questions nobody will be asked needn't be generated
+        session.questions.cancel()
         feedbacks = [e.get("feedback") for e in session.events if e.get("type") == "answer_submitted"]
         feedbacks = [f for f in feedbacks if isinstance(f, dict)]
 
@@ -108,15 +204,28 @@ class InterviewOrchestrator:
             vals = [float(f.get(key, 0.0)) for f in feedbacks]
             return sum(vals) / len(vals) if vals else 0.0
 
-        # Generate comprehensive report using LLM
-        llm_report = await self._llm.generate_final_report(session.events)
+        if session.summary_task is not None:
+            await asyncio.gather(session.summary_task, return_exceptions=True)
 
         averages = {
             "technical_accuracy": avg("technical_accuracy"),
             "clarity": avg("clarity"),
             "confidence": avg("confidence"),
-            "attitude": llm_report.get("attitude_score", 0.85),
         }
+        self._vision.update(session.telemetry, session.vision)
+        vision = self._vision.summary(session.vision)
+        # The prompt only carries the rolling summary and fixed-size aggregates, never the raw events
+        llm_report = await self._llm.generate_final_report(
+            session.summary,
+            {
+                "questions_answered": len(feedbacks),
+                "num_questions": len(session.questions),
+                "averages": {key: round(value, 3) for key, value in averages.items()},
+                "telemetry": session.telemetry.as_dict(),
+                "vision": vision,
+            },
+        )
+        averages["attitude"] = llm_report.get("attitude_score", 0.85)
         hiring_probability = 0.5 * averages["technical_accuracy"] + 0.2 * averages["clarity"] + 0.3 * averages["confidence"]
 
         return InterviewReport(
@@ -125,7 +234,9 @@ class InterviewOrchestrator:
             hiring_probability=hiring_probability,
             averages=averages,
             events=session.events,
+            vision=vision,
             areas_of_improvement=llm_report.get("areas_of_improvement", []),
-            mistakes=llm_report.get("mistakes", []),
+            # Telemetry alerts are measured, so they stand even when the LLM report falls back
+            mistakes=[*llm_report.get("mistakes", []), *vision["alerts"]],
             tips=llm_report.get("tips", []),
         )
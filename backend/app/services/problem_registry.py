@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import base64
+import json
+import marshal
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.services.sandbox_pool import HarnessBundle
+
+DEFAULT_PROBLEM_ID = "invert-binary-tree"
+DEFAULT_SCALING_SIZES = [250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000]
+
+# Helper runtimes executed before the user's code. Solutions may redefine
+# TreeNode/ListNode; the codecs look the class up at call time so the
+# user's definition wins. All serializers are linear in the input size.
+PRELUDE = '''
+import random as _random
+import time as _time
+import tracemalloc as _tracemalloc
+from collections import deque as _deque
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class TreeNode:
+    def __init__(self, val=0, left=None, right=None):
+        self.val = val
+        self.left = left
+        self.right = right
+
+
+class ListNode:
+    def __init__(self, val=0, next=None):
+        self.val = val
+        self.next = next
+
+
+def _list_to_tree(values):
+    if not values or values[0] is None:
+        return None
+    root = TreeNode(values[0])
+    parents = _deque([root])
+    i, n = 1, len(values)
+    while i < n:
+        node = parents.popleft()
+        if values[i] is not None:
+            node.left = TreeNode(values[i])
+            parents.append(node.left)
+        i += 1
+        if i < n and values[i] is not None:
+            node.right = TreeNode(values[i])
+            parents.append(node.right)
+        i += 1
+    return root
+
+
+def _tree_to_list(root):
+    result = []
+    queue = _deque([root] if root else [])
+    while queue:
+        node = queue.popleft()
+        if node is None:
+            result.append(None)
+            continue
+        result.append(node.val)
+        queue.append(node.left)
+        queue.append(node.right)
+    # Trim trailing Nones
+    while result and result[-1] is None:
+        result.pop()
+    return result
+
+
+def _list_to_linked_list(values):
+    head = None
+    for value in reversed(values):
+        node = ListNode(value)
+        node.next = head
+        head = node
+    return head
+
+
+def _linked_list_to_list(head):
+    result = []
+    while head is not None:
+        result.append(head.val)
+        head = head.next
+    return result
+
+
+def _generate_arg(spec, n, rng):
+    kind = spec.get("kind", "range")
+    if kind == "range":
+        return list(range(n))
+    if kind == "shuffled":
+        values = list(range(n))
+        rng.shuffle(values)
+        return values
+    if kind == "size":
+        return n
+    if kind == "const":
+        return spec.get("value")
+    raise ValueError(f"Unknown generator {kind!r}")
+
+
+def _resolve_entrypoint(name):
+    namespace = globals()
+    if name in namespace:
+        return namespace[name]
+    if "Solution" in namespace:
+        return getattr(namespace["Solution"](), name)
+    raise NameError(f"name {name!r} is not defined")
+'''
+
+# codec name -> (decoder, encoder) helper names from PRELUDE; None means pass-through
+CODECS: dict[str, tuple[str | None, str | None]] = {
+    "json": (None, None),
+    "tree": ("_list_to_tree", "_tree_to_list"),
+    "linked_list": ("_list_to_linked_list", "_linked_list_to_list"),
+}
+
+HARNESS_TEMPLATE = '''
+def __harness__(cases, report, probe):
+    decoders = [{decoders}]
+    encode = {encoder}
+    for tc in cases:
+        try:
+            solve = _resolve_entrypoint({entrypoint!r})
+            args = [arg if decode is None else decode(arg) for decode, arg in zip(decoders, tc["args"])]
+            probe.start()
+            actual = solve(*args)
+            metrics = probe.stop()
+            if encode is not None:
+                actual = encode(actual)
+            report({{
+                "id": tc["id"],
+                "input": tc["input"],
+                "expected": tc["expected_text"],
+                "actual": str(actual),
+                "passed": actual == tc["expected"],
+                "error": None,
+                **metrics
+            }})
+        except Exception as e:
+            report({{
+                "id": tc["id"],
+                "input": tc["input"],
+                "expected": tc["expected_text"],
+                "actual": "Error",
+                "passed": False,
+                "error": str(e)
+            }})
+
+
+__harness__(__cases__, __report__, __probe__)
+'''
+
+# Appended for problems with a "scaling" spec; only runs when the job asks for analysis
+SCALING_TEMPLATE = '''
+def __scale__(sample, probe, budget_s):
+    decoders = [{decoders}]
+    generators = {generators!r}
+    rng = _random.Random(0)
+    deadline = _time.perf_counter() + budget_s
+    try:
+        solve = _resolve_entrypoint({entrypoint!r})
+        for n in {sizes!r}:
+            best_ms = None
+            for _ in range(3):
+                args = [arg if decode is None else decode(arg) for decode, arg in zip(decoders, [_generate_arg(g, n, rng) for g in generators])]
+                probe.start()
+                solve(*args)
+                runtime_ms = probe.stop()["runtime_ms"]
+                best_ms = runtime_ms if best_ms is None else min(best_ms, runtime_ms)
+
+            # One extra traced run for auxiliary space; tracing would skew the timings above
+            args = [arg if decode is None else decode(arg) for decode, arg in zip(decoders, [_generate_arg(g, n, rng) for g in generators])]
+            _tracemalloc.start()
+            try:
+                solve(*args)
+                alloc_bytes = _tracemalloc.get_traced_memory()[1]
+            finally:
+                _tracemalloc.stop()
+
+            sample({{"n": n, "runtime_ms": best_ms, "alloc_bytes": alloc_bytes}})
+            # The next size is twice as large; stop while a quadratic solution still fits the budget
+            if _time.perf_counter() + 24 * best_ms / 1000 > deadline:
+                break
+    except Exception:
+        pass
+
+
+if __analyze_s__ > 0:
+    __scale__(__sample__, __probe__, __analyze_s__)
+'''
+
+
+@dataclass(frozen=True)
+class Problem:
+    id: str
+    title: str
+    version: int
+    entrypoint: str
+    num_cases: int
+    scalable: bool
+    expected_complexity: str | None
+    bundle: HarnessBundle
+
+
+def _compile(source: str, filename: str) -> str:
+    return base64.b64encode(marshal.dumps(compile(source, filename, "exec"))).decode()
+
+
+def build_problem(spec: dict, prelude_code: str) -> Problem:
+    problem_id = spec["id"]
+    entrypoint = spec["entrypoint"]
+    input_codecs = spec.get("input_codecs", ["json"])
+    output_codec = spec.get("output_codec", "json")
+    for codec in (*input_codecs, output_codec):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec!r}")
+
+    decoders = ", ".join(str(CODECS[codec][0]) for codec in input_codecs)
+    harness = HARNESS_TEMPLATE.format(
+        decoders=decoders,
+        encoder=CODECS[output_codec][1],
+        entrypoint=entrypoint,
+    )
+
+    scaling = spec.get("scaling")
+    if scaling:
+        harness += SCALING_TEMPLATE.format(
+            decoders=decoders,
+            generators=scaling["args"],
+            sizes=scaling.get("sizes", DEFAULT_SCALING_SIZES),
+            entrypoint=entrypoint,
+        )
+
+    # Display strings are rendered here once instead of on every run
+    cases = [
+        {
+            "id": tc["id"],
+            "args": tc["args"],
+            "expected": tc["expected"],
+            "input": ", ".join(str(arg) for arg in tc["args"]),
+            "expected_text": str(tc["expected"]),
+        }
+        for tc in spec["test_cases"]
+    ]
+
+    version = int(spec.get("version", 1))
+    return Problem(
+        id=problem_id,
+        title=spec.get("title", problem_id),
+        version=version,
+        entrypoint=entrypoint,
+        num_cases=len(cases),
+        scalable=bool(scaling),
+        expected_complexity=(scaling or {}).get("expected"),
+        bundle=HarnessBundle(
+            key=f"{problem_id}@{version}",
+            payload={
+                "prelude": prelude_code,
+                "harness": _compile(harness, f"<harness:{problem_id}>"),
+                # Kept serialized so each run decodes fresh objects the solution may mutate
+                "cases": json.dumps(cases),
+            },
+        ),
+    )
+
+
+class ProblemRegistry:
+    """Dojo problems loaded once from JSON specs, with harnesses precompiled."""
+
+    def __init__(self, problems: dict[str, Problem]) -> None:
+        self._problems = problems
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "ProblemRegistry":
+        prelude_code = _compile(PRELUDE, "<prelude>")
+        problems: dict[str, Problem] = {}
+        for path in sorted(Path(directory).glob("*.json")):
+            try:
+                problem = build_problem(json.loads(path.read_text()), prelude_code)
+            except Exception as e:
+                print(f"Error loading problem {path.name}: {e}")
+                continue
+            problems[problem.id] = problem
+        return cls(problems)
+
+    def get(self, problem_id: str | None) -> Problem:
+        problem_id = problem_id or DEFAULT_PROBLEM_ID
+        if problem_id not in self._problems:
+            raise KeyError("Unknown problem")
+        return self._problems[problem_id]
+
+    def list(self) -> list[Problem]:
+        return list(self._problems.values())
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.models.schemas import InterviewQuestion
+
+# 32 bands of 4 rows: pairs above ~0.6 Jaccard almost always share a bucket
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+# Signatures cover the opening of a job description, about what the generation prompt sees;
+# past that, hashing costs more and rarely changes which entries match
+MAX_SHINGLED_WORDS = 400
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_WORD = re.compile(r"[a-z0-9+#.]+")
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+def minhash(text: str) -> list[int]:
+    words = normalize_text(text).split()[:MAX_SHINGLED_WORDS]
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+@dataclass
+class BankEntry:
+    entry_id: int
+    role: str
+    fingerprint: str
+    signature: list[int]
+    questions: list[dict]
+
+
+class QuestionBank:
+    """Previously generated questions, keyed by role and job-description fingerprint.
+
+    An exact fingerprint match is a hit; otherwise a MinHash/LSH index over
+    the job descriptions finds near-duplicates for the same role. Signatures
+    are kept in memory and rebuilt from SQLite on startup. `lookup` and
+    `add` hash and hit SQLite, so async callers run them in a thread; the
+    lock covers the in-memory index as well as the connection.
+    """
+
+    def __init__(self, path: str | Path, threshold: float = 0.7, max_per_entry: int = 60) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.max_per_entry = max_per_entry
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS question_bank (
+                entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                role TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                questions TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (role, fingerprint)
+            )
+            """
+        )
+        self._entries: dict[int, BankEntry] = {}
+        self._by_key: dict[tuple[str, str], int] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], set[int]] = {}
+        for entry_id, role, fp, signature, questions in self._conn.execute(
+            "SELECT entry_id, role, fingerprint, signature, questions FROM question_bank"
+        ):
+            self._index(BankEntry(entry_id, role, fp, json.loads(signature), json.loads(questions)))
+
+    def lookup(self, role: str, job_description: str, limit: int) -> list[InterviewQuestion]:
+        """Up to `limit` banked questions for this role and the closest matching job descriptions."""
+        role_key = normalize_text(role)
+        fp = fingerprint(job_description)
+        signature = minhash(job_description)
+
+        scored: list[tuple[float, list[dict]]] = []
+        with self._lock:
+            exact = self._by_key.get((role_key, fp))
+            matched = False
+            for entry_id in self._candidates(signature):
+                entry = self._entries[entry_id]
+                if entry.role != role_key:
+                    continue
+                score = 1.0 if entry_id == exact else similarity(signature, entry.signature)
+                if score >= self.threshold:
+                    # The list itself, not the entry: a concurrent add replaces entry.questions
+                    scored.append((score, entry.questions))
+                    matched = matched or entry_id == exact
+            if exact is not None and not matched:
+                scored.append((1.0, self._entries[exact].questions))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        # Closest matches first; within an entry, a random pick so repeat sessions vary
+        seen: set[str] = set()
+        picked: list[InterviewQuestion] = []
+        for _, entry_questions in scored:
+            for q in random.sample(entry_questions, len(entry_questions)):
+                key = normalize_text(q["prompt"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                picked.append(InterviewQuestion(**q))
+                if len(picked) >= limit:
+                    return picked
+        return picked
+
+    def add(self, role: str, job_description: str, questions: list[InterviewQuestion]) -> None:
+        if not questions:
+            return
+        role_key = normalize_text(role)
+        fp = fingerprint(job_description)
+        new = [{"id": q.id, "kind": q.kind, "prompt": q.prompt, "context": q.context} for q in questions]
+        # Hashed before taking the lock; only needed for a new entry, but cheap next to a generation
+        signature = minhash(job_description)
+
+        with self._lock:
+            entry_id = self._by_key.get((role_key, fp))
+            if entry_id is not None:
+                entry = self._entries[entry_id]
+                known = {normalize_text(q["prompt"]) for q in entry.questions}
+                entry.questions = (entry.questions + [q for q in new if normalize_text(q["prompt"]) not in known])[-self.max_per_entry:]
+                self._conn.execute(
+                    "UPDATE question_bank SET questions = ?, updated_at = ? WHERE entry_id = ?",
+                    (json.dumps(entry.questions), time.time(), entry_id),
+                )
+                return
+
+            cursor = self._conn.execute(
+                "INSERT INTO question_bank (role, fingerprint, signature, questions, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (role_key, fp, json.dumps(signature), json.dumps(new[-self.max_per_entry:]), time.time()),
+            )
+            self._index(BankEntry(cursor.lastrowid, role_key, fp, signature, new[-self.max_per_entry:]))
+
+    def _index(self, entry: BankEntry) -> None:
+        self._entries[entry.entry_id] = entry
+        self._by_key[(entry.role, entry.fingerprint)] = entry.entry_id
+        for band in range(BANDS):
+            key = (band, tuple(entry.signature[band * ROWS:(band + 1) * ROWS]))
+            self._buckets.setdefault(key, set()).add(entry.entry_id)
+
+    def _candidates(self, signature: list[int]) -> set[int]:
+        found: set[int] = set()
+        for band in range(BANDS):
+            found |= self._buckets.get((band, tuple(signature[band * ROWS:(band + 1) * ROWS])), set())
+        return found
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import sqlite3
 import uuid
-from typing import Optional
+from pathlib import Path
+from typing import AsyncIterator, Optional
 
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
 from app.models.schemas import InterviewQuestion
+from app.services.json_stream import IncrementalJsonArrayParser
+from app.services.llm_gateway import LlmGateway, Priority
+from app.services.question_bank import QuestionBank
+from app.services.resume_index import ResumeIndex
+
+# Resume excerpts per prompt; bounds the prompt whatever the resume's length
+RESUME_CHUNKS = 4
 
 
 class QuestionList(BaseModel):
@@ -17,12 +26,35 @@ class QuestionList(BaseModel):
 
 
 class RagEngine:
-    def __init__(self) -> None:
-        self.llm = ChatGroq(
-            api_key=settings.groq_api_key,
-            model_name=settings.groq_model,
-            temperature=0.7,
-        )
+    PARSER = JsonOutputParser(pydantic_object=QuestionList)
+    PROMPT = ChatPromptTemplate.from_template(
+        """
+            You are an expert technical recruiter. Generate {num_questions} interview questions for a {role} position.
+            
+            Job Description:
+            {job_description}
+            {resume}
+            The questions should be a mix of technical and behavioral.
+            {avoid}
+            {format_instructions}
+            """
+    )
+
+    def __init__(self, gateway: LlmGateway, resume_index: ResumeIndex | None = None) -> None:
+        self.gateway = gateway
+        self.llm = gateway.chat(temperature=0.7)
+        self.bank = self._open_bank()
+        self.resume_index = resume_index
+
+    @staticmethod
+    def _open_bank() -> QuestionBank | None:
+        if not settings.question_bank_enabled:
+            return None
+        try:
+            return QuestionBank(Path(settings.data_dir) / "question_bank.sqlite3", threshold=settings.question_bank_similarity)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Question bank unavailable, generating every question: {e}")
+            return None
 
     async def generate_questions(
         self,
@@ -31,66 +63,114 @@ class RagEngine:
         role: str,
         num_questions: int,
     ) -> list[InterviewQuestion]:
-        parser = JsonOutputParser(pydantic_object=QuestionList)
-        
-        prompt = ChatPromptTemplate.from_template(
-            """
-            You are an expert technical recruiter. Generate {num_questions} interview questions for a {role} position.
-            
-            Job Description:
-            {job_description}
-            
-            The questions should be a mix of technical and behavioral.
-            
-            {format_instructions}
-            """
+        return [q async for q in self.stream_questions(resume_id, job_description, role, num_questions)]
+
+    async def stream_questions(
+        self,
+        resume_id: Optional[str],
+        job_description: str,
+        role: str,
+        num_questions: int,
+    ) -> AsyncIterator[InterviewQuestion]:
+        """Yield each question as soon as it is available: banked ones first, then freshly generated."""
+        resume_chunks: list[str] = []
+        if resume_id and self.resume_index is not None:
+            try:
+                resume_chunks = await self.resume_index.retrieve(resume_id, f"{role}\n{job_description[:1000]}", k=RESUME_CHUNKS)
+            except Exception as e:
+                print(f"Error retrieving resume context: {e}")
+
+        # With a resume, only the generic half comes from the bank; the rest is personalized
+        bank_limit = num_questions // 2 if resume_chunks else num_questions
+        banked = []
+        if self.bank is not None and bank_limit:
+            # MinHash and SQLite work; kept off the event loop
+            banked = await asyncio.to_thread(self.bank.lookup, role, job_description, bank_limit)
+        for question in banked:
+            yield question.model_copy(update={"id": str(uuid.uuid4()), "context": job_description[:200] + "..."})
+        if len(banked) < num_questions:
+            async for question in self._generate(
+                job_description, role, num_questions, start=len(banked), avoid=banked, resume_chunks=resume_chunks
+            ):
+                yield question
+
+    async def _generate(
+        self,
+        job_description: str,
+        role: str,
+        num_questions: int,
+        start: int,
+        avoid: list[InterviewQuestion],
+        resume_chunks: list[str],
+    ) -> AsyncIterator[InterviewQuestion]:
+        """Generate questions start..num_questions-1 with the LLM, banking what it produces."""
+        wanted = num_questions - start
+        messages = self.PROMPT.format_messages(
+            num_questions=wanted,
+            role=role,
+            job_description=job_description[:2000], # Truncate if too long
+            resume=(
+                "\nCandidate Resume (most relevant excerpts; ask about their actual experience where it fits):\n"
+                + "\n---\n".join(resume_chunks)
+                + "\n"
+                if resume_chunks
+                else ""
+            ),
+            avoid=(
+                "\nDo not repeat any of these questions:\n" + "\n".join(f"- {q.prompt}" for q in avoid) + "\n"
+                if avoid
+                else ""
+            ),
+            format_instructions=self.PARSER.get_format_instructions(),
         )
-        
-        chain = prompt | self.llm | parser
-        
+
+        produced: list[InterviewQuestion] = []
         try:
-            result = await chain.ainvoke({
-                "num_questions": num_questions,
-                "role": role,
-                "job_description": job_description[:2000], # Truncate if too long
-                "format_instructions": parser.get_format_instructions(),
-            })
-            
-            questions_text = result.get("questions", [])
-            
-            questions: list[InterviewQuestion] = []
-            for i, q_text in enumerate(questions_text):
-                kind = "technical" if "technical" in q_text.lower() or i < num_questions // 2 else "behavioral"
-                # Simple heuristic for kind, can be improved
-                
-                questions.append(
-                    InterviewQuestion(
-                        id=str(uuid.uuid4()),
-                        kind=kind,
-                        prompt=q_text,
-                        context=job_description[:200] + "...",
-                    )
-                )
-            return questions
-            
+            stream_parser = IncrementalJsonArrayParser()
+            # A candidate is waiting on session start, so this counts as interview traffic
+            async with self.gateway.slot(Priority.INTERVIEW):
+                async for chunk in self.llm.astream(messages):
+                    text = chunk.content if isinstance(chunk.content, str) else ""
+                    for q_text in stream_parser.feed(text):
+                        if not isinstance(q_text, str) or len(produced) >= wanted:
+                            continue
+                        i = start + len(produced)
+                        # Simple heuristic for kind, can be improved
+                        kind = "technical" if "technical" in q_text.lower() or i < num_questions // 2 else "behavioral"
+                        question = InterviewQuestion(
+                            id=str(uuid.uuid4()),
+                            kind=kind,
+                            prompt=q_text,
+                            context=job_description[:200] + "...",
+                        )
+                        produced.append(question)
+                        yield question
+            if not produced:
+                raise ValueError("No questions in LLM output")
+            # Resume-specific questions are not reusable by other candidates
+            if self.bank is not None and not resume_chunks:
+                await asyncio.to_thread(self.bank.add, role, job_description, produced)
+            return
+
         except Exception as e:
             print(f"Error generating questions: {e}")
-            # Fallback
-            questions: list[InterviewQuestion] = []
-            for i in range(num_questions):
-                kind = "technical" if i < max(1, num_questions - 1) else "behavioral"
-                prompt_text = (
-                    f"({role}) Question {i + 1}: Based on the job description, explain a relevant concept and give an example." 
-                    if kind == "technical"
-                    else "Tell me about a time you faced a difficult deadline. What did you do?"
-                )
-                context = (job_description[:500] + "...") if job_description else None
-                questions.append(
-                    InterviewQuestion(
-                        id=str(uuid.uuid4()),
-                        kind=kind,
-                        prompt=prompt_text,
-                        context=context,
-                    )
-                )
-            return questions
+
+        # Fallback: fill whatever the LLM didn't deliver
+        for i in range(start + len(produced), num_questions):
+            yield self._fallback_question(i, job_description, role, num_questions)
+
+    @staticmethod
+    def _fallback_question(i: int, job_description: str, role: str, num_questions: int) -> InterviewQuestion:
+        kind = "technical" if i < max(1, num_questions - 1) else "behavioral"
+        prompt_text = (
+            f"({role}) Question {i + 1}: Based on the job description, explain a relevant concept and give an example." 
+            if kind == "technical"
+            else "Tell me about a time you faced a difficult deadline. What did you do?"
+        )
+        context = (job_description[:500] + "...") if job_description else None
+        return InterviewQuestion(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            prompt=prompt_text,
+            context=context,
+        )
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+# What each prompt section is about, used as its BM25 query
+SECTION_TERMS = {
+    "tech_stack": "tech stack languages frameworks tools infrastructure database cloud backend frontend platform engineering",
+    "values": "values principles culture mission leadership beliefs",
+    "interview": "interview questions process rounds coding system design leetcode onsite",
+    "news": "news announced launch launches recent acquisition release",
+    "sentiment": "reviews rating employees work life balance culture pay management pros cons",
+}
+# A hit returned by a section's own search is likely relevant to it even without term overlap
+OWN_SEARCH_BONUS = 1.0
+# Rough chars-per-token for English; close enough to budget a prompt without a tokenizer
+CHARS_PER_TOKEN = 4
+# A snippet is only cut to fit when at least this many tokens of room remain
+MIN_SNIPPET_TOKENS = 24
+# No single snippet may take more than this share of a section's budget
+MAX_SNIPPET_SHARE = 0.5
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def _tokens(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class Bm25:
+    def __init__(self, docs: list[list[str]], k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.docs = [Counter(doc) for doc in docs]
+        self.lengths = [len(doc) for doc in docs]
+        self.avg_length = sum(self.lengths) / len(docs) if docs else 0.0
+        df = Counter(term for doc in self.docs for term in doc)
+        n = len(docs)
+        self.idf = {term: math.log(1 + (n - count + 0.5) / (count + 0.5)) for term, count in df.items()}
+
+    def score(self, query: list[str], i: int) -> float:
+        doc = self.docs[i]
+        norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / (self.avg_length or 1.0))
+        total = 0.0
+        for term in set(query):
+            tf = doc.get(term)
+            if tf:
+                total += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+        return total
+
+
+def build_context(sections: dict[str, list[dict] | None], company: str, tokens_per_section: int) -> dict[str, str]:
+    """Turn raw search hits into compact per-section prompt text.
+
+    Hits are deduplicated across all searches by normalized text and URL
+    and scored with BM25 against every section's terms. Each snippet goes
+    to one section, the one it matches best, and sections are packed in
+    score order up to their token budget; sections with room left then
+    take leftovers. URLs and other hit metadata are dropped.
+    """
+    snippets: list[tuple[str, str]] = []
+    origins: list[set[str]] = []
+    seen: dict[str, int] = {}
+    for section, hits in sections.items():
+        for hit in hits or []:
+            title = " ".join(str(hit.get("title") or "").split())
+            body = " ".join(str(hit.get("body") or "").split())
+            if not body and not title:
+                continue
+            keys = [" ".join(_tokens(body or title))]
+            if hit.get("href"):
+                keys.append(str(hit["href"]).rstrip("/"))
+            index = next((seen[k] for k in keys if k in seen), None)
+            if index is None:
+                index = len(snippets)
+                snippets.append((title, body))
+                origins.append(set())
+            for k in keys:
+                seen[k] = index
+            origins[index].add(section)
+
+    # The company name is in nearly every snippet and says nothing about the section
+    company_terms = set(_tokens(company))
+    bm25 = Bm25([_tokens(f"{title} {body}") for title, body in snippets])
+    scores: dict[str, list[float]] = {}
+    for section in sections:
+        query = [t for t in _tokens(SECTION_TERMS.get(section, section)) if t not in company_terms]
+        scores[section] = [
+            bm25.score(query, i) + (OWN_SEARCH_BONUS if section in origins[i] else 0.0) for i in range(len(snippets))
+        ]
+
+    # Each snippet first goes to the section it matches best; sections with room left then take leftovers
+    best = {i: max(sections, key=lambda section: scores[section][i]) for i in range(len(snippets))}
+    budgets = {section: tokens_per_section * CHARS_PER_TOKEN for section in sections}
+    lines: dict[str, list[str]] = {section: [] for section in sections}
+    used: set[int] = set()
+    for first_pass in (True, False):
+        for section in sections:
+            ranked = sorted(((scores[section][i], i) for i in range(len(snippets)) if i not in used), reverse=True)
+            for score, i in ranked:
+                if score <= 0 or budgets[section] < MIN_SNIPPET_TOKENS * CHARS_PER_TOKEN:
+                    break
+                if first_pass and best[i] != section:
+                    continue
+                title, body = snippets[i]
+                line = f"- {title}: {body}" if title and body else f"- {title or body}"
+                room = min(budgets[section], int(tokens_per_section * CHARS_PER_TOKEN * MAX_SNIPPET_SHARE))
+                if len(line) > room:
+                    line = line[:room].rsplit(" ", 1)[0] + "..."
+                lines[section].append(line)
+                used.add(i)
+                budgets[section] -= len(line) + 1
+    return {section: "\n".join(lines[section]) or "No results" for section in sections}
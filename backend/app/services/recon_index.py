@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.services.recon_context import SECTION_TERMS
+
+
+def _quote(phrase: str) -> str:
+    # FTS5 string literal; anything inside double quotes is matched as plain tokens
+    return '"' + phrase.replace('"', '""') + '"'
+
+
+class PageIndex:
+    """Every search hit recon has fetched, in an SQLite FTS5 index.
+
+    Pages are keyed by (company, url) so refetching a page updates it in
+    place. When live search fails, `search` answers from this corpus
+    instead: pages mentioning the company, ranked by bm25 against the
+    section's terms. That includes pages first fetched for other companies.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str | Path, max_pages: int = 50_000) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_pages = max_pages
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS recon_pages (
+                id INTEGER PRIMARY KEY,
+                company TEXT NOT NULL,
+                section TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                UNIQUE (company, url)
+            );
+            CREATE INDEX IF NOT EXISTS idx_recon_pages_fetched ON recon_pages (fetched_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS recon_pages_fts USING fts5(
+                title, body, content='recon_pages', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS recon_pages_ai AFTER INSERT ON recon_pages BEGIN
+                INSERT INTO recon_pages_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS recon_pages_ad AFTER DELETE ON recon_pages BEGIN
+                INSERT INTO recon_pages_fts (recon_pages_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS recon_pages_au AFTER UPDATE ON recon_pages BEGIN
+                INSERT INTO recon_pages_fts (recon_pages_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+                INSERT INTO recon_pages_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+            END;
+            """
+        )
+
+    def add(self, company: str, section: str, hits: list[dict]) -> None:
+        now = time.time()
+        rows = [
+            (company, section, str(hit.get("href") or ""), str(hit.get("title") or ""), str(hit.get("body") or ""), now)
+            for hit in hits
+            if hit.get("href") and (hit.get("title") or hit.get("body"))
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO recon_pages (company, section, url, title, body, fetched_at) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (company, url) DO UPDATE SET
+                        section = excluded.section, title = excluded.title, body = excluded.body, fetched_at = excluded.fetched_at
+                    """,
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune()
+
+    def search(self, company: str, section: str, limit: int) -> list[dict]:
+        """Indexed pages about `company`, best matches for the section first, shaped like search hits."""
+        name = " ".join(re.findall(r"[a-z0-9]+", company.lower()))
+        terms = SECTION_TERMS.get(section, section).split()
+        if not name or not terms:
+            return []
+        query = f"{_quote(name)} AND ({' OR '.join(_quote(t) for t in terms)})"
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT p.title, p.url, p.body FROM recon_pages_fts
+                JOIN recon_pages p ON p.id = recon_pages_fts.rowid
+                WHERE recon_pages_fts MATCH ?
+                ORDER BY bm25(recon_pages_fts), p.fetched_at DESC
+                LIMIT ?
+                """,
+                (query, limit),
+            ).fetchall()
+        return [{"title": title, "href": url, "body": body} for title, url, body in rows]
+
+    def _prune(self) -> None:
+        # Over the cap: drop the pages fetched longest ago
+        self._conn.execute(
+            "DELETE FROM recon_pages WHERE id IN (SELECT id FROM recon_pages ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_pages,),
+        )
@@ -1,45 +1,135 @@
+import asyncio
+import copy
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 from duckduckgo_search import DDGS
-from app.services.llm_agent import LlmAgent
+from app.core.config import settings
+from app.services.llm_agent import COMPANY_INTEL_FALLBACK, LlmAgent
+from app.services.recon_context import build_context
+from app.services.recon_index import PageIndex
+
+# section -> (query template, max results)
+SEARCHES = {
+    # Broader query so smaller companies still return something
+    "tech_stack": ("{company} engineering tech stack languages frameworks tools", 4),
+    "values": ("{company} core values leadership principles", 3),
+    "interview": ("{company} software engineer interview questions leetcode", 3),
+    "news": ("{company} engineering technology news recent", 3),
+    # Glassdoor/Blind
+    "sentiment": ("{company} reviews site:glassdoor.com OR site:teamblind.com", 5),
+}
+
+# How long each section's search results stay fresh; news moves much faster than values
+SECTION_TTLS = {
+    "tech_stack": 14 * 86400,
+    "values": 30 * 86400,
+    "interview": 7 * 86400,
+    "news": 6 * 3600,
+    "sentiment": 3 * 86400,
+}
+# A section whose search failed with nothing cached is retried after this, not on every request
+EMPTY_RETRY_S = 600
+
+
+def normalize_company(company: str) -> str:
+    # "Stripe", " stripe ", "Stripe, Inc." all share one cache entry
+    name = re.sub(r"[^a-z0-9]+", " ", company.lower()).strip()
+    return re.sub(r"\s+(inc|llc|ltd|corp|corporation|co)$", "", name)
+
+
+class IntelCache:
+    """Company intel by normalized name, kept past expiry so stale entries can still be served.
+
+    Each entry holds the last search hits per section, each with its own
+    fetch time, and the LLM analysis built from them.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS company_intel (
+                key TEXT PRIMARY KEY,
+                company TEXT NOT NULL,
+                sections TEXT NOT NULL,
+                analysis TEXT,
+                analyzed_at REAL
+            )
+            """
+        )
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT company, sections, analysis, analyzed_at FROM company_intel WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "company": row[0],
+            "sections": json.loads(row[1]),
+            "analysis": json.loads(row[2]) if row[2] else None,
+            "analyzed_at": row[3],
+        }
+
+    def put(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO company_intel (key, company, sections, analysis, analyzed_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry["company"],
+                    json.dumps(entry["sections"]),
+                    json.dumps(entry["analysis"]) if entry["analysis"] is not None else None,
+                    entry["analyzed_at"],
+                ),
+            )
+
 
 class ReconService:
     def __init__(self, llm_agent: LlmAgent):
-        self.ddgs = DDGS()
         self.llm = llm_agent
+        self.search_timeout_s = settings.recon_search_timeout_s
+        self.max_stale_s = settings.recon_max_stale_s
+        self.section_tokens = settings.recon_section_tokens
+        # ddgs is blocking; its own threads keep a hung search from starving asyncio.to_thread users
+        self._searches = ThreadPoolExecutor(max_workers=2 * len(SEARCHES), thread_name_prefix="recon")
+        self.cache = IntelCache(Path(settings.data_dir) / "recon.sqlite3")
+        self.pages = self._open_index()
+        # One refresh per company at a time; concurrent requests share it
+        self._refreshing: dict[str, asyncio.Task] = {}
 
     async def gather_intel(self, company: str) -> dict:
+        key = normalize_company(company) or company
         try:
-            # 1. Search for Tech Stack (Broader query)
-            tech_results = self.ddgs.text(f"{company} engineering tech stack languages frameworks tools", max_results=4)
-            
-            # 2. Search for Values
-            values_results = self.ddgs.text(f"{company} core values leadership principles", max_results=3)
-            
-            # 3. Search for Interview Questions/Topics
-            interview_results = self.ddgs.text(f"{company} software engineer interview questions leetcode", max_results=3)
-            
-            # 4. Search for News
-            news_results = self.ddgs.text(f"{company} engineering technology news recent", max_results=3)
-
-            # 5. Search for Sentiment (Glassdoor/Blind)
-            sentiment_results = self.ddgs.text(f"{company} reviews site:glassdoor.com OR site:teamblind.com", max_results=5)
-
-            # Combine context
-            context = {
-                "tech_stack": str(tech_results),
-                "values": str(values_results),
-                "interview": str(interview_results),
-                "news": str(news_results),
-                "sentiment": str(sentiment_results)
-            }
+            entry = await asyncio.to_thread(self.cache.get, key)
+            if entry is not None and self._analyzed(entry):
+                stale = self._stale_sections(entry)
+                if stale:
+                    refresh = self._refresh(key, company)
+                    # Serve stale data at once unless it is too old to be useful
+                    fetched = [
+                        entry["sections"][section]["fetched_at"] for section in stale if entry["sections"].get(section, {}).get("hits")
+                    ]
+                    if fetched and time.time() - min(fetched) > self.max_stale_s:
+                        entry = await asyncio.shield(refresh) or entry
+                return self._respond(company, entry)
 
-            # Analyze with LLM
-            analysis = await self.llm.analyze_company_intel(company, context)
-            
-            # Add logo
-            analysis["name"] = company
-            analysis["logo"] = f"https://logo.clearbit.com/{company.lower().replace(' ', '')}.com"
-            
-            return analysis
+            entry = await asyncio.shield(self._refresh(key, company))
+            # A fallback analysis is still shown this once; it is never cached
+            if entry is None or entry["analysis"] is None:
+                raise RuntimeError("no search results to analyze")
+            return self._respond(company, entry)
         except Exception as e:
             print(f"Recon Error: {e}")
             return {
@@ -51,3 +141,131 @@ class ReconService:
                 "tips": ["Could not retrieve live data."],
                 "news": []
             }
+
+    def _refresh(self, key: str, company: str) -> asyncio.Task:
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._rebuild(key, company))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        return task
+
+    async def _rebuild(self, key: str, company: str) -> dict | None:
+        """Re-run the stale searches, re-analyze, and store. Returns the entry, or None if nothing was found."""
+        try:
+            entry = await asyncio.to_thread(self.cache.get, key) or {"company": company, "sections": {}, "analysis": None, "analyzed_at": None}
+            stale = self._stale_sections(entry)
+
+            # All searches run at once; latency is the slowest one, capped by the timeout
+            results = await asyncio.gather(
+                *(self._search(section, SEARCHES[section][0].format(company=company), SEARCHES[section][1]) for section in stale)
+            )
+            now = time.time()
+            for section, hits in zip(stale, results):
+                # A failed search keeps the previous hits and their age
+                if hits:
+                    entry["sections"][section] = {"hits": hits, "fetched_at": now}
+                    await self._index(company, section, hits)
+                elif not entry["sections"].get(section, {}).get("hits") or entry["sections"][section].get("offline"):
+                    # Nothing live: answer from pages fetched earlier, for this company or any other
+                    offline = await self._lookup(company, section, SEARCHES[section][1])
+                    # Backdated so the section turns stale again after EMPTY_RETRY_S and live search is retried
+                    entry["sections"][section] = {
+                        "hits": offline,
+                        "fetched_at": now - SECTION_TTLS[section] + EMPTY_RETRY_S,
+                        "offline": True,
+                    }
+
+            sections = {section: entry["sections"].get(section, {}).get("hits") for section in SEARCHES}
+            if not any(sections.values()):
+                return None
+            if not any(results) and self._analyzed(entry):
+                # Nothing new to analyze; keep serving what we have
+                await asyncio.to_thread(self.cache.put, key, entry)
+                return entry
+
+            # Deduplicated, relevance-ranked snippets in a fixed token budget per section
+            context = build_context(sections, company, self.section_tokens)
+
+            # Analyze with LLM
+            analysis = await self.llm.analyze_company_intel(company, context)
+            entry["company"] = company
+            if analysis == COMPANY_INTEL_FALLBACK:
+                # A failed analysis is never cached, so the next request retries it;
+                # the search hits are kept either way
+                if not self._analyzed(entry):
+                    entry["analysis"] = entry["analyzed_at"] = None
+                await asyncio.to_thread(self.cache.put, key, entry)
+                return entry if self._analyzed(entry) else {**entry, "analysis": analysis}
+            entry["analysis"] = analysis
+            entry["analyzed_at"] = now
+            await asyncio.to_thread(self.cache.put, key, entry)
+            return entry
+        except Exception as e:
+            print(f"Recon Error: {e}")
+            return None
+
+    def _open_index(self) -> PageIndex | None:
+        try:
+            return PageIndex(Path(settings.data_dir) / "recon.sqlite3")
+        except sqlite3.Error as e:
+            # e.g. an SQLite build without FTS5; recon still works, just without the offline corpus
+            print(f"Recon page index unavailable: {e}")
+            return None
+
+    async def _index(self, company: str, section: str, hits: list[dict]) -> None:
+        if self.pages is None:
+            return
+        try:
+            # FTS5 upserts and the periodic prune are blocking SQLite work
+            await asyncio.to_thread(self.pages.add, normalize_company(company) or company, section, hits)
+        except sqlite3.Error as e:
+            print(f"Recon index write error: {e}")
+
+    async def _lookup(self, company: str, section: str, limit: int) -> list[dict]:
+        if self.pages is None:
+            return []
+        try:
+            return await asyncio.to_thread(self.pages.search, normalize_company(company) or company, section, limit)
+        except sqlite3.Error as e:
+            print(f"Recon index read error: {e}")
+            return []
+
+    async def _search(self, section: str, query: str, max_results: int) -> list[dict]:
+        """One search off the event loop; an empty list when it fails or times out."""
+        loop = asyncio.get_running_loop()
+        try:
+            # A client per search: DDGS sessions are not safe to share across threads
+            future = loop.run_in_executor(self._searches, lambda: DDGS().text(query, max_results=max_results))
+            return list(await asyncio.wait_for(future, self.search_timeout_s) or [])
+        except Exception as e:
+            print(f"Recon Error ({section}): {e!r}")
+            return []
+
+    @staticmethod
+    def _analyzed(entry: dict) -> bool:
+        # Entries written before fallbacks stopped being cached may still hold one
+        return entry["analysis"] is not None and entry["analysis"] != COMPANY_INTEL_FALLBACK
+
+    def _ages(self, entry: dict) -> dict[str, float]:
+        now = time.time()
+        # Sections never fetched successfully count as infinitely old
+        return {
+            section: now - entry["sections"][section]["fetched_at"] if section in entry["sections"] else float("inf")
+            for section in SEARCHES
+        }
+
+    def _stale_sections(self, entry: dict) -> list[str]:
+        return [section for section, age in self._ages(entry).items() if age > SECTION_TTLS[section]]
+
+    def _respond(self, company: str, entry: dict) -> dict:
+        analysis = copy.deepcopy(entry["analysis"])
+
+        # Add logo
+        analysis["name"] = company
+        analysis["logo"] = f"https://logo.clearbit.com/{company.lower().replace(' ', '')}.com"
+        ages = self._ages(entry)
+        analysis["sectionAges"] = {
+            section: round(ages[section]) for section, data in entry["sections"].items() if data["hits"] and not data.get("offline")
+        }
+        return analysis
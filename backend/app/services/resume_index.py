@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import threading
+from pathlib import Path
+
+# Optional AI deps (requirements-ai.txt); without them resumes are skipped or searched lexically
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    import chromadb
+except ImportError:
+    chromadb = None
+
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 20
+# Upper bound on how long question generation waits for an upload still being ingested
+INGEST_WAIT_S = 15.0
+_TERM = re.compile(r"[a-z0-9+#]+")
+
+
+def chunk_text(text: str, size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, size - overlap)
+    return [" ".join(words[i:i + size]) for i in range(0, max(1, len(words) - overlap), step)]
+
+
+class ResumeIndex:
+    """Chunks of each uploaded resume, embedded once and searched per session.
+
+    Ingestion (PDF parsing, chunking, embedding) runs in a worker thread
+    after the upload responds. Chunks are embedded into a persistent local
+    Chroma collection when chromadb is installed; the chunk text is also
+    kept as JSON so retrieval degrades to term overlap without it.
+    """
+
+    def __init__(self, data_dir: str | Path) -> None:
+        self.uploads_dir = Path(data_dir) / "uploads"
+        self.chunks_dir = Path(data_dir) / "resume_chunks"
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: dict[str, asyncio.Task] = {}
+        self._collection = None
+        if chromadb is not None:
+            try:
+                client = chromadb.PersistentClient(path=str(Path(data_dir) / "resume_vectors"))
+                self._collection = client.get_or_create_collection("resume_chunks", metadata={"hnsw:space": "cosine"})
+            except Exception as e:
+                print(f"Resume vector store unavailable, using keyword retrieval: {e}")
+
+    def schedule(self, resume_id: str, pdf_path: str | Path, content_hash: str) -> None:
+        """Start ingesting an uploaded resume without blocking the caller.
+
+        Ingestion is keyed by content hash: a resume whose PDF was seen before
+        reuses the existing chunks, and identical concurrent uploads share one task.
+        """
+        (self.chunks_dir / f"{resume_id}.ref").write_text(content_hash)
+        if content_hash in self._pending or (self.chunks_dir / f"{content_hash}.json").exists():
+            return
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.ingest, content_hash, Path(pdf_path)))
+        self._pending[content_hash] = task
+        task.add_done_callback(lambda _: self._pending.pop(content_hash, None))
+
+    def ingest(self, doc_id: str, pdf_path: Path) -> int:
+        if PdfReader is None:
+            print("pypdf is not installed; resume ingestion skipped")
+            return 0
+        try:
+            reader = PdfReader(str(pdf_path))
+            text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        except Exception as e:
+            print(f"Error parsing resume {doc_id}: {e}")
+            return 0
+
+        chunks = chunk_text(text)
+        with self._lock:
+            if self._collection is not None and chunks:
+                try:
+                    self._collection.delete(where={"doc_id": doc_id})
+                    self._collection.add(
+                        ids=[f"{doc_id}:{i}" for i in range(len(chunks))],
+                        documents=chunks,
+                        metadatas=[{"doc_id": doc_id, "position": i} for i in range(len(chunks))],
+                    )
+                except Exception as e:
+                    print(f"Error embedding resume {doc_id}: {e}")
+            (self.chunks_dir / f"{doc_id}.json").write_text(json.dumps(chunks))
+        return len(chunks)
+
+    async def retrieve(self, resume_id: str, query: str, k: int = 4) -> list[str]:
+        """The `k` resume chunks most relevant to `query`, in resume order."""
+        doc_id = self._doc_id(resume_id)
+        pending = self._pending.get(doc_id)
+        if pending is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(pending), INGEST_WAIT_S)
+            except Exception:
+                pass
+        elif not (self.chunks_dir / f"{doc_id}.json").exists():
+            # Uploaded before ingestion existed: ingest once on first use
+            pdf_path = self.uploads_dir / f"{resume_id}.pdf"
+            if pdf_path.exists():
+                await asyncio.to_thread(self.ingest, doc_id, pdf_path)
+        return await asyncio.to_thread(self._search, doc_id, query, k)
+
+    def _doc_id(self, resume_id: str) -> str:
+        ref = self.chunks_dir / f"{resume_id}.ref"
+        return ref.read_text().strip() if ref.exists() else resume_id
+
+    def _search(self, doc_id: str, query: str, k: int) -> list[str]:
+        chunks_file = self.chunks_dir / f"{doc_id}.json"
+        if not chunks_file.exists():
+            return []
+        chunks: list[str] = json.loads(chunks_file.read_text())
+        if len(chunks) <= k:
+            return chunks
+
+        if self._collection is not None:
+            try:
+                with self._lock:
+                    result = self._collection.query(
+                        query_texts=[query], n_results=k, where={"doc_id": doc_id}, include=["metadatas"]
+                    )
+                positions = sorted(m["position"] for m in result["metadatas"][0])
+                if positions:
+                    return [chunks[p] for p in positions if p < len(chunks)]
+            except Exception as e:
+                print(f"Error querying resume vectors: {e}")
+
+        terms = set(_TERM.findall(query.lower()))
+        scored = sorted(range(len(chunks)), key=lambda i: len(terms & set(_TERM.findall(chunks[i].lower()))), reverse=True)
+        return [chunks[i] for i in sorted(scored[:k])]
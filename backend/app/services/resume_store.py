@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import UploadFile
+
+CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    sha256: str
+    path: Path
+    size: int
+    duplicate: bool
+
+
+class ResumeBlobStore:
+    """Content-addressed storage for uploaded resume PDFs.
+
+    Uploads are streamed to a temp file in fixed-size chunks, hashed on the
+    way through and then renamed to blobs/<sha256>.pdf, so identical files
+    are stored once. Disk writes run in a worker thread to keep the event
+    loop free.
+    """
+
+    def __init__(self, upload_dir: str | Path, max_bytes: int) -> None:
+        self.blob_dir = Path(upload_dir) / "blobs"
+        self.max_bytes = max_bytes
+
+    async def save(self, upload: UploadFile) -> StoredBlob:
+        await asyncio.to_thread(self.blob_dir.mkdir, parents=True, exist_ok=True)
+        tmp_path = self.blob_dir / f".upload-{uuid.uuid4().hex}"
+        digest = hashlib.sha256()
+        size = 0
+        fh = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            while chunk := await upload.read(CHUNK_BYTES):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise UploadTooLarge(f"Resume exceeds the {self.max_bytes / (1024 * 1024):g} MB limit")
+                digest.update(chunk)
+                await asyncio.to_thread(fh.write, chunk)
+        except BaseException:
+            await asyncio.to_thread(fh.close)
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+            raise
+        await asyncio.to_thread(fh.close)
+
+        sha256 = digest.hexdigest()
+        path = self.blob_dir / f"{sha256}.pdf"
+        if path.exists():
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+            return StoredBlob(sha256=sha256, path=path, size=size, duplicate=True)
+        # Atomic, so a concurrent identical upload just overwrites with the same bytes
+        await asyncio.to_thread(os.replace, tmp_path, path)
+        return StoredBlob(sha256=sha256, path=path, size=size, duplicate=False)
+
+
+class ResumeMetadataStore:
+    """Resume records in SQLite (WAL), replacing the rewrite-everything resumes.json.
+
+    Every write is a single transaction, so concurrent uploads can't drop
+    each other's rows, and a partial unique index guarantees at most one
+    default resume per user. An existing resumes.json is imported once.
+    """
+
+    def __init__(self, path: str | Path, legacy_json: str | Path | None = None) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL DEFAULT '',
+                name TEXT NOT NULL,
+                date TEXT NOT NULL,
+                sha256 TEXT,
+                is_default INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_resumes_user_created ON resumes (user_id, created_at);
+            CREATE INDEX IF NOT EXISTS idx_resumes_user_date ON resumes (user_id, date);
+            CREATE INDEX IF NOT EXISTS idx_resumes_sha ON resumes (sha256);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_resumes_one_default ON resumes (user_id) WHERE is_default = 1;
+            """
+        )
+        if legacy_json is not None:
+            self._migrate(Path(legacy_json))
+
+    def add(self, resume_id: str, name: str, sha256: str | None, user_id: str = "") -> dict:
+        """Insert a resume; the user's first resume becomes their default."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO resumes (id, user_id, name, date, sha256, is_default, created_at)
+                VALUES (?, ?, ?, ?, ?, NOT EXISTS (SELECT 1 FROM resumes WHERE user_id = ? AND is_default = 1), ?)
+                """,
+                (resume_id, user_id, name, datetime.now().strftime("%Y-%m-%d"), sha256, user_id, time.time()),
+            )
+            row = self._conn.execute("SELECT * FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        return _record(row)
+
+    def list(self, user_id: str = "", limit: int = 100, offset: int = 0) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM resumes WHERE user_id = ? ORDER BY created_at, rowid LIMIT ? OFFSET ?",
+                (user_id, limit, offset),
+            ).fetchall()
+        return [_record(row) for row in rows]
+
+    def get(self, resume_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        return _record(row) if row is not None else None
+
+    def set_default(self, resume_id: str, user_id: str = "") -> bool:
+        """Make `resume_id` the user's only default, atomically. False if it isn't theirs."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM resumes WHERE id = ? AND user_id = ?", (resume_id, user_id)
+                ).fetchone()
+                if exists is None:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute("UPDATE resumes SET is_default = 0 WHERE user_id = ? AND is_default = 1", (user_id,))
+                self._conn.execute("UPDATE resumes SET is_default = 1 WHERE id = ?", (resume_id,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def _migrate(self, legacy_json: Path) -> None:
+        if not legacy_json.exists():
+            return
+        try:
+            items = json.loads(legacy_json.read_text())
+        except (OSError, ValueError) as e:
+            print(f"Skipping resumes.json migration: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                has_default = False
+                for i, item in enumerate(items):
+                    is_default = bool(item.get("is_default")) and not has_default
+                    has_default = has_default or is_default
+                    self._conn.execute(
+                        """
+                        INSERT OR IGNORE INTO resumes (id, user_id, name, date, sha256, is_default, created_at)
+                        VALUES (?, '', ?, ?, ?, ?, ?)
+                        """,
+                        (item["id"], item.get("name", ""), item.get("date", ""), item.get("sha256"), is_default, now - len(items) + i),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        # Keep the original around, but never import it twice
+        legacy_json.replace(legacy_json.with_name(legacy_json.name + ".migrated"))
+        print(f"Migrated {len(items)} resumes from {legacy_json.name}")
+
+
+def _record(row: sqlite3.Row) -> dict:
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "date": row["date"],
+        "is_default": bool(row["is_default"]),
+        "sha256": row["sha256"],
+    }
@@ -2,6 +2,7 @@ import os
 import json
 from googleapiclient.discovery import build
 from app.services.llm_agent import LlmAgent
+from app.services.llm_gateway import Priority
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
@@ -91,10 +92,11 @@ class RoadmapService:
         chain = prompt | self.llm.llm | parser
         
         try:
-            roadmap_data = await chain.ainvoke({
-                "role": role,
-                "format_instructions": parser.get_format_instructions()
-            })
+            async with self.llm.gateway.slot(Priority.BACKGROUND):
+                roadmap_data = await chain.ainvoke({
+                    "role": role,
+                    "format_instructions": parser.get_format_instructions()
+                })
             
             # 2. ENRICH WITH CONTENT
             for step in roadmap_data.get('steps', []):
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator
+
+WORKER_SCRIPT = Path(__file__).with_name("sandbox_worker.py")
+STREAM_LIMIT = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class HarnessBundle:
+    """Precompiled prelude, harness and test data for one problem version.
+
+    A worker receives the payload the first time it runs that problem and
+    caches it under `key`; later jobs only reference the key.
+    """
+
+    key: str
+    payload: dict
+
+
+class SandboxTimeout(Exception):
+    pass
+
+
+class SandboxCrashed(Exception):
+    pass
+
+
+class SandboxWorker:
+    def __init__(self, proc: asyncio.subprocess.Process) -> None:
+        self.proc = proc
+        self.jobs = 0
+        self.loaded: set[str] = set()
+
+    @classmethod
+    async def spawn(cls) -> "SandboxWorker":
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-I",
+            str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=STREAM_LIMIT,
+        )
+        worker = cls(proc)
+        # Wait for the handshake so a worker is only handed out once its imports are warm
+        ready = await proc.stdout.readline()
+        if not ready:
+            worker.kill()
+            await proc.wait()
+            raise SandboxCrashed("Sandbox worker failed to start")
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def send(self, job: dict) -> None:
+        self.proc.stdin.write(json.dumps(job).encode() + b"\n")
+        await self.proc.stdin.drain()
+
+    async def receive(self) -> dict:
+        line = await self.proc.stdout.readline()
+        if not line:
+            raise SandboxCrashed("Sandbox worker exited unexpectedly")
+        return json.loads(line)
+
+    def kill(self) -> None:
+        if self.alive:
+            self.proc.kill()
+
+
+class SandboxPool:
+    """Fixed-size pool of warm sandbox interpreters.
+
+    Jobs are sent to an idle worker over its stdin pipe. A worker that times
+    out or dies is killed and replaced, and healthy workers are retired after
+    `max_jobs` runs so state leaked by user code can't accumulate. Each job
+    gets its own builtins; a job that rebinds names in a shared module is
+    reported by the worker, which is then replaced right away.
+    """
+
+    def __init__(self, size: int, max_jobs: int, timeout: float) -> None:
+        self.size = max(1, size)
+        self.max_jobs = max(1, max_jobs)
+        self.timeout = timeout
+        self._idle: asyncio.Queue[SandboxWorker] | None = None
+        self._workers: set[SandboxWorker] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+        self._job_ids = itertools.count(1)
+        self._closed = False
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            self._closed = False
+            spawns = await asyncio.gather(*(SandboxWorker.spawn() for _ in range(self.size)), return_exceptions=True)
+            workers = [w for w in spawns if isinstance(w, SandboxWorker)]
+            failed = next((e for e in spawns if isinstance(e, BaseException)), None)
+            if failed is not None:
+                # Leave the pool unstarted so the next start() retries instead of serving an empty queue
+                for worker in workers:
+                    worker.kill()
+                await asyncio.gather(*(worker.proc.wait() for worker in workers), return_exceptions=True)
+                raise failed
+            idle: asyncio.Queue[SandboxWorker] = asyncio.Queue()
+            for worker in workers:
+                self._workers.add(worker)
+                idle.put_nowait(worker)
+            self._idle = idle
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        workers = list(self._workers)
+        self._workers.clear()
+        for worker in workers:
+            worker.kill()
+        # Reap the processes while the loop is still alive to close their transports
+        await asyncio.gather(*(worker.proc.wait() for worker in workers), return_exceptions=True)
+        self._idle = None
+
+    async def stream(self, source: str, bundle: HarnessBundle, analyze_s: float = 0.0) -> AsyncIterator[dict]:
+        """Run `source` against `bundle` on an idle worker, yielding each message it sends back.
+
+        Intermediate messages have type "case" or "sample"; the last one has
+        type "done". `analyze_s` is the scaling-run budget, added to the timeout.
+        Closing the generator early kills the worker, which is how a running
+        job gets cancelled.
+        """
+        if self._idle is None:
+            await self.start()
+
+        worker = await self._idle.get()
+        healthy = False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout + analyze_s
+        try:
+            job = {"id": next(self._job_ids), "source": source, "bundle_key": bundle.key, "analyze_s": analyze_s}
+            if bundle.key not in worker.loaded:
+                job["bundle"] = bundle.payload
+            await worker.send(job)
+            worker.loaded.add(bundle.key)
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                message = await asyncio.wait_for(worker.receive(), timeout=remaining)
+                if message.get("type") == "done":
+                    worker.jobs += 1
+                    # A job that patched shared module state leaves the worker unfit for the next one
+                    healthy = not message.pop("recycle", False)
+                    yield message
+                    return
+                yield message
+        except asyncio.TimeoutError:
+            raise SandboxTimeout(f"Execution exceeded {self.timeout:g}s") from None
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise SandboxCrashed("Sandbox worker exited unexpectedly") from e
+        finally:
+            # Scaling runs leave a large heap behind that would inflate later RSS readings
+            if healthy and worker.jobs < self.max_jobs and not analyze_s and not self._closed:
+                self._idle.put_nowait(worker)
+            else:
+                self._retire(worker)
+
+    def _retire(self, worker: SandboxWorker) -> None:
+        worker.kill()
+        self._workers.discard(worker)
+        if self._closed:
+            return
+        task = asyncio.create_task(self._replace())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _replace(self) -> None:
+        while not self._closed:
+            try:
+                worker = await SandboxWorker.spawn()
+            except Exception as e:
+                print(f"Sandbox spawn error: {e}")
+                await asyncio.sleep(1)
+                continue
+            if self._closed or self._idle is None:
+                worker.kill()
+                return
+            self._workers.add(worker)
+            self._idle.put_nowait(worker)
+            return
@@ -0,0 +1,191 @@
+"""Long-lived sandbox worker process used by SandboxPool.
+
+Started once with ``python -I sandbox_worker.py`` and then fed jobs as
+newline-delimited JSON on stdin. Each job's source is executed in a fresh
+namespace, with its own copy of the builtins, between the problem's
+precompiled prelude and harness, which are sent once per worker and cached
+by key. Imported modules are still shared between jobs, so a job that
+rebinds anything in a module (or imports a new one) is flagged with
+"recycle" and the pool replaces the worker instead of reusing it. Anything the user code prints is
+captured and returned in the final reply instead of touching the protocol
+channel. Test case results are written back as separate "case" messages as
+soon as each one finishes.
+"""
+import base64
+import builtins
+import io
+import json
+import marshal
+import os
+import sys
+import traceback
+
+# Warm the module cache with what Dojo solutions and harnesses typically
+# import, so the user's own `import collections` etc. is a dict lookup
+# instead of disk I/O, and so a first import doesn't get the worker recycled.
+import bisect  # noqa: F401
+import collections  # noqa: F401
+import functools  # noqa: F401
+import heapq  # noqa: F401
+import itertools  # noqa: F401
+import math  # noqa: F401
+import random  # noqa: F401
+import re  # noqa: F401
+import string  # noqa: F401
+import time
+import tracemalloc  # noqa: F401
+import typing  # noqa: F401
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MAX_OUTPUT_CHARS = 64 * 1024
+
+
+def _open_protocol_channel():
+    # Move the real stdin/stdout to private fds and point 0/1 at /dev/null so
+    # user code can neither read queued jobs nor corrupt replies.
+    proto_in = os.fdopen(os.dup(0), "rb")
+    proto_out = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    return proto_in, proto_out
+
+
+def _reset_peak_rss() -> None:
+    # Linux lets a process reset its own RSS high-water mark, which makes
+    # VmHWM a per-measurement peak instead of a lifetime one
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_kb() -> int | None:
+    # ru_maxrss also covers the server process this worker was forked from
+    # (Linux carries it across exec), so prefer this process's own VmHWM
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+
+class Probe:
+    """Wall time, CPU time and peak RSS around a single solution call."""
+
+    def start(self) -> None:
+        _reset_peak_rss()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+
+    def stop(self) -> dict:
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        return {"runtime_ms": wall * 1000, "cpu_ms": cpu * 1000, "memory_kb": _peak_rss_kb()}
+
+
+def _truncate(text: str) -> str:
+    if len(text) <= MAX_OUTPUT_CHARS:
+        return text
+    return text[:MAX_OUTPUT_CHARS] + "\n... output truncated ..."
+
+
+def _shared_state() -> dict:
+    # Identity of every loaded module and of each name bound in it; cheap
+    # (well under a millisecond) and catches `math.sqrt = ...`-style patches
+    return {
+        name: (id(module), hash(tuple(map(id, vars(module).values()))))
+        for name, module in list(sys.modules.items())
+        if module is not None
+    }
+
+
+def load_bundle(payload: dict) -> tuple:
+    prelude = marshal.loads(base64.b64decode(payload["prelude"]))
+    harness = marshal.loads(base64.b64decode(payload["harness"]))
+    return prelude, harness, payload["cases"]
+
+
+def run_job(source: str, bundle: tuple, report, sample, analyze_s: float) -> dict:
+    prelude, harness, cases = bundle
+    stdout, stderr = io.StringIO(), io.StringIO()
+    # The harness calls __report__ once per finished test case and, when
+    # analyze_s > 0, __sample__ once per input size of the scaling run
+    namespace = {
+        "__name__": "__main__",
+        # A copy, so rebinding print/range/sorted can't leak into later jobs
+        "__builtins__": dict(builtins.__dict__),
+        "__report__": report,
+        "__sample__": sample,
+        "__probe__": Probe(),
+        "__analyze_s__": analyze_s,
+    }
+    recursion_limit = sys.getrecursionlimit()
+    shared = _shared_state()
+
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(), stdout, stderr
+    ok = True
+    try:
+        exec(prelude, namespace)
+        exec(compile(source, "<solution>", "exec"), namespace)
+        # Decoded per run so one submission can't mutate the next one's inputs
+        namespace["__cases__"] = json.loads(cases)
+        exec(harness, namespace)
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+    except BaseException:
+        ok = False
+        # Drop this module's frame so the traceback starts at the user's code
+        etype, value, tb = sys.exc_info()
+        traceback.print_exception(etype, value, tb.tb_next, file=stderr)
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+        sys.setrecursionlimit(recursion_limit)
+
+    return {
+        "type": "done",
+        "ok": ok,
+        "stdout": _truncate(stdout.getvalue()),
+        "stderr": _truncate(stderr.getvalue()),
+        "recycle": _shared_state() != shared,
+    }
+
+
+def main() -> None:
+    proto_in, proto_out = _open_protocol_channel()
+    proto_out.write(b'{"ready": true}\n')
+    proto_out.flush()
+
+    def send(message: dict) -> None:
+        proto_out.write(json.dumps(message).encode() + b"\n")
+        proto_out.flush()
+
+    bundles = {}
+    for line in proto_in:
+        job = json.loads(line)
+        job_id = job.get("id")
+        if "bundle" in job:
+            bundles[job["bundle_key"]] = load_bundle(job["bundle"])
+
+        def report(case: dict) -> None:
+            send({"id": job_id, "type": "case", "case": case})
+
+        def sample(point: dict) -> None:
+            send({"id": job_id, "type": "sample", "sample": point})
+
+        reply = run_job(job["source"], bundles[job["bundle_key"]], report, sample, job.get("analyze_s", 0.0))
+        reply["id"] = job_id
+        send(reply)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.services.interview_session import InterviewSession
+
+# Records buffered per session before an append hits disk; durable records flush at once
+LOG_FLUSH_EVERY = 32
+
+
+class MemorySessionStore:
+    """Sessions held in process memory only; lost on restart.
+
+    The async methods are what the orchestrator calls; stores with disk
+    I/O override them to keep it off the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: OrderedDict[str, InterviewSession] = OrderedDict()
+
+    def create(self, session: InterviewSession) -> None:
+        self._sessions[session.session_id] = session
+
+    def get(self, session_id: str) -> InterviewSession:
+        if session_id not in self._sessions:
+            raise KeyError("Unknown session")
+        return self._sessions[session_id]
+
+    def record(self, session: InterviewSession, record: dict, durable: bool = False) -> None:
+        session.apply(record)
+
+    def close(self) -> None:
+        pass
+
+    async def acreate(self, session: InterviewSession) -> None:
+        self.create(session)
+
+    async def aget(self, session_id: str) -> InterviewSession:
+        return self.get(session_id)
+
+    async def arecord(self, session: InterviewSession, record: dict, durable: bool = False) -> None:
+        self.record(session, record, durable)
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+class DiskSessionStore(MemorySessionStore):
+    """Hot sessions in an LRU, everything else on disk as snapshot + append-only log.
+
+    Each session has <id>.json (a snapshot) and <id>.log (JSON lines applied
+    after it). Sessions idle longer than `idle_ttl_s`, or beyond
+    `max_sessions`, are spilled: snapshotted and dropped from memory. A
+    lookup that misses memory, including the first one after a restart,
+    loads the snapshot and replays the log. Logs are folded into a fresh
+    snapshot every `snapshot_every` records so replay stays short.
+
+    Session state only changes on the caller's thread. The async methods
+    hand file reads and writes to one I/O thread, which runs them in
+    submission order, so appends and snapshots land as they would inline.
+    Use either the sync or the async methods on a store, not both.
+    """
+
+    def __init__(self, directory: str | Path, max_sessions: int = 1000, idle_ttl_s: float = 1800.0, snapshot_every: int = 500) -> None:
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_s = idle_ttl_s
+        self.snapshot_every = snapshot_every
+        self._last_used: dict[str, float] = {}
+        self._buffers: dict[str, list[str]] = {}
+        self._logged: dict[str, int] = {}
+        # One thread: file operations must not overtake each other
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sessions")
+        # One disk load per session at a time; concurrent lookups share it
+        self._loading: dict[str, asyncio.Task] = {}
+
+    def create(self, session: InterviewSession) -> None:
+        super().create(session)
+        self._touch(session.session_id)
+        self._write_snapshot(session.session_id, self._prepare_snapshot(session))
+        for session_id, text in self._evictions():
+            self._write_snapshot(session_id, text)
+
+    def get(self, session_id: str) -> InterviewSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            snapshot_text, log_text = self._read(session_id)
+            session = self._replay(snapshot_text, log_text)
+            self._sessions[session_id] = session
+            if log_text is not None:
+                self._write_snapshot(session_id, self._prepare_snapshot(session))
+        self._touch(session_id)
+        for evicted_id, text in self._evictions():
+            self._write_snapshot(evicted_id, text)
+        return session
+
+    def record(self, session: InterviewSession, record: dict, durable: bool = False) -> None:
+        action = self._append_record(session, record, durable)
+        if action == "snapshot":
+            self._write_snapshot(session.session_id, self._prepare_snapshot(session))
+        elif action == "flush":
+            self._append(session.session_id, self._buffers.pop(session.session_id))
+
+    def close(self) -> None:
+        for session in list(self._sessions.values()):
+            self._write_snapshot(session.session_id, self._prepare_snapshot(session))
+
+    async def acreate(self, session: InterviewSession) -> None:
+        super().create(session)
+        self._touch(session.session_id)
+        await self._run(self._write_snapshot, session.session_id, self._prepare_snapshot(session))
+        await self._spill()
+
+    async def aget(self, session_id: str) -> InterviewSession:
+        session = self._sessions.get(session_id)
+        if session is None:
+            task = self._loading.get(session_id)
+            if task is None:
+                task = asyncio.get_running_loop().create_task(self._aload(session_id))
+                self._loading[session_id] = task
+                task.add_done_callback(lambda _: self._loading.pop(session_id, None))
+            # Evicted again while it loaded: the snapshot is on disk, so keep serving this copy
+            session = self._sessions.setdefault(session_id, await asyncio.shield(task))
+        self._touch(session_id)
+        await self._spill()
+        return session
+
+    async def arecord(self, session: InterviewSession, record: dict, durable: bool = False) -> None:
+        action = self._append_record(session, record, durable)
+        if action == "snapshot":
+            await self._run(self._write_snapshot, session.session_id, self._prepare_snapshot(session))
+        elif action == "flush":
+            await self._run(self._append, session.session_id, self._buffers.pop(session.session_id))
+
+    async def aclose(self) -> None:
+        for session in list(self._sessions.values()):
+            await self._run(self._write_snapshot, session.session_id, self._prepare_snapshot(session))
+        self._io.shutdown(wait=True)
+
+    async def _aload(self, session_id: str) -> InterviewSession:
+        snapshot_text, log_text = await self._run(self._read, session_id)
+        session = self._replay(snapshot_text, log_text)
+        self._sessions[session_id] = session
+        if log_text is not None:
+            await self._run(self._write_snapshot, session_id, self._prepare_snapshot(session))
+        return session
+
+    async def _spill(self) -> None:
+        for session_id, text in self._evictions():
+            await self._run(self._write_snapshot, session_id, text)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    def _touch(self, session_id: str) -> None:
+        self._sessions.move_to_end(session_id)
+        self._last_used[session_id] = time.monotonic()
+
+    def _append_record(self, session: InterviewSession, record: dict, durable: bool) -> str | None:
+        """Apply and buffer one record; returns the disk work it needs: "snapshot", "flush" or None."""
+        session.apply(record)
+        session_id = session.session_id
+        buffer = self._buffers.setdefault(session_id, [])
+        buffer.append(json.dumps({"seq": session.seq, **record}))
+        self._logged[session_id] = self._logged.get(session_id, 0) + 1
+        if self._logged[session_id] >= self.snapshot_every:
+            return "snapshot"
+        if durable or len(buffer) >= LOG_FLUSH_EVERY:
+            return "flush"
+        return None
+
+    def _evictions(self) -> list[tuple[str, str]]:
+        """Drop spilled sessions from memory; returns (session id, snapshot text) for each to write."""
+        now = time.monotonic()
+        spilled = []
+        for session_id in list(self._sessions):
+            over_capacity = len(self._sessions) > self.max_sessions
+            idle = now - self._last_used.get(session_id, now) > self.idle_ttl_s
+            if not over_capacity and not idle:
+                # LRU order: everything after this was used more recently
+                break
+            session = self._sessions[session_id]
+            if session.busy:
+                continue
+            spilled.append((session_id, self._prepare_snapshot(session)))
+            del self._sessions[session_id]
+            self._last_used.pop(session_id, None)
+        return spilled
+
+    def _prepare_snapshot(self, session: InterviewSession) -> str:
+        # Serialized here, on the thread that owns the session, so the I/O thread never reads live state.
+        # Records up to session.seq now live in the snapshot; replay skips any that linger.
+        # Dropping the per-session counters keeps them bounded by the sessions still logging
+        self._buffers.pop(session.session_id, None)
+        self._logged.pop(session.session_id, None)
+        return json.dumps(session.snapshot())
+
+    @staticmethod
+    def _replay(snapshot_text: str | None, log_text: str | None) -> InterviewSession:
+        """Snapshot plus log. Callers then fold the log into a fresh snapshot and drop it,
+        so later appends never land after a torn or corrupted line."""
+        if snapshot_text is None:
+            raise KeyError("Unknown session")
+        session = InterviewSession.from_snapshot(json.loads(snapshot_text))
+        for line in (log_text or "").splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-append; nothing after it is trusted
+                break
+            if record.pop("seq") <= session.seq:
+                continue
+            session.apply(record)
+        return session
+
+    # File operations below run on the I/O thread for the async methods
+
+    def _paths(self, session_id: str) -> tuple[Path, Path]:
+        # Session ids are server-generated UUIDs, but never let one escape the directory
+        safe = Path(session_id).name
+        return self.directory / f"{safe}.json", self.directory / f"{safe}.log"
+
+    def _read(self, session_id: str) -> tuple[str | None, str | None]:
+        snapshot_path, log_path = self._paths(session_id)
+        try:
+            snapshot_text = snapshot_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None, None
+        try:
+            log_text = log_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            log_text = None
+        return snapshot_text, log_text
+
+    def _append(self, session_id: str, lines: list[str]) -> None:
+        _, log_path = self._paths(session_id)
+        with open(log_path, "a", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+
+    def _write_snapshot(self, session_id: str, text: str) -> None:
+        snapshot_path, log_path = self._paths(session_id)
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, snapshot_path)
+        log_path.unlink(missing_ok=True)
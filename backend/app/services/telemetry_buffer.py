@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import base64
+import math
+import time
+from array import array
+
+EMOTIONS = ("neutral", "happy", "sad", "angry", "fearful", "disgusted", "surprised")
+OTHER_EMOTION = len(EMOTIONS)
+NO_EMOTION = -1
+
+
+def emotion_code(label: object) -> int:
+    if isinstance(label, int):
+        # Already a code, as sent by the binary telemetry protocol
+        return label if NO_EMOTION <= label <= OTHER_EMOTION else OTHER_EMOTION
+    if not isinstance(label, str):
+        return NO_EMOTION
+    try:
+        return EMOTIONS.index(label.lower())
+    except ValueError:
+        return OTHER_EMOTION
+
+
+def emotion_label(code: int) -> str | None:
+    if code == NO_EMOTION:
+        return None
+    return EMOTIONS[code] if code < len(EMOTIONS) else "other"
+
+
+class _Ring:
+    """Fixed-capacity columns of typed arrays; the oldest row is overwritten when full."""
+
+    def __init__(self, columns: dict[str, tuple[str, float]], capacity: int) -> None:
+        self.capacity = capacity
+        self.columns = {name: array(code, [fill]) * capacity for name, (code, fill) in columns.items()}
+        self.size = 0
+        self.head = 0
+        # Rows ever appended; lets readers ask for "everything after row N"
+        self.count = 0
+
+    def append(self, **values: float) -> None:
+        for name, value in values.items():
+            self.columns[name][self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.count += 1
+
+    def ordered(self, name: str) -> array:
+        """Oldest-to-newest copy of one column."""
+        column = self.columns[name]
+        if self.size < self.capacity:
+            return column[:self.size]
+        return column[self.head:] + column[:self.head]
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "head": self.head,
+            "count": self.count,
+            "columns": {name: base64.b64encode(column.tobytes()).decode() for name, column in self.columns.items()},
+        }
+
+    def load(self, data: dict) -> None:
+        self.size = data["size"]
+        self.head = data["head"]
+        self.count = data.get("count", self.size)
+        for name, encoded in data["columns"].items():
+            column = array(self.columns[name].typecode)
+            column.frombytes(base64.b64decode(encoded))
+            if len(column) == self.capacity:
+                self.columns[name] = column
+
+
+class TelemetryBuffer:
+    """Per-session telemetry in array-backed ring buffers, one column per metric.
+
+    The newest `capacity` frames are kept raw (about 17 bytes each). Every
+    `window_frames` frames are also folded into a window aggregate, and the
+    newest `max_windows` of those are kept in a second ring. Whole-session
+    totals are built from the windows only, so replaying the windows
+    reproduces the totals without the raw frames.
+    """
+
+    def __init__(self, capacity: int = 1024, window_frames: int = 30, max_windows: int = 600) -> None:
+        self.window_frames = window_frames
+        self.frames = _Ring(
+            {"t": ("d", 0.0), "gaze": ("f", math.nan), "posture": ("f", math.nan), "emotion": ("b", NO_EMOTION)},
+            capacity,
+        )
+        self.windows = _Ring(
+            {"t": ("d", 0.0), "n": ("H", 0), "gaze": ("f", math.nan), "posture": ("f", math.nan), "emotion": ("b", NO_EMOTION)},
+            max_windows,
+        )
+        # Whole-session totals, updated per window
+        self.total_frames = 0
+        self.sums = {"gaze": 0.0, "posture": 0.0}
+        self.counts = {"gaze": 0, "posture": 0}
+        self.emotions = [0] * (OTHER_EMOTION + 1)
+        self._reset_partial()
+
+    def add(self, timestamp: float | None, gaze: object, posture: object, emotion: object) -> dict | None:
+        """Record one frame. Returns the window aggregate when this frame completes one."""
+        t = _seconds(timestamp)
+        g = float(gaze) if isinstance(gaze, (int, float)) else math.nan
+        p = float(posture) if isinstance(posture, (int, float)) else math.nan
+        e = emotion_code(emotion)
+        self.frames.append(t=t, gaze=g, posture=p, emotion=e)
+
+        partial = self._partial
+        partial["t0"] = partial["t0"] or t
+        partial["t1"] = t
+        partial["n"] += 1
+        if not math.isnan(g):
+            partial["gaze_sum"] += g
+            partial["gaze_n"] += 1
+        if not math.isnan(p):
+            partial["posture_sum"] += p
+            partial["posture_n"] += 1
+        if e != NO_EMOTION:
+            partial["emotions"][e] += 1
+
+        if partial["n"] < self.window_frames:
+            return None
+        window = self._window(partial)
+        self._reset_partial()
+        return window
+
+    def add_window(self, window: dict) -> None:
+        """Fold a completed window into the aggregates (live, or when replaying a session log)."""
+        n = int(window["n"])
+        self.windows.append(
+            t=window["t1"],
+            n=min(n, 0xFFFF),
+            gaze=math.nan if window["gaze"] is None else window["gaze"],
+            posture=math.nan if window["posture"] is None else window["posture"],
+            emotion=emotion_code(window["emotion"]),
+        )
+        self.total_frames += n
+        for key in ("gaze", "posture"):
+            if window[key] is not None:
+                self.sums[key] += window[key] * window[f"{key}_n"]
+                self.counts[key] += window[f"{key}_n"]
+        for label, count in window["emotions"].items():
+            self.emotions[emotion_code(label)] += count
+
+    def as_dict(self) -> dict:
+        """A small, fixed-size summary for reports and LLM prompts."""
+        sums = dict(self.sums)
+        counts = dict(self.counts)
+        emotions = list(self.emotions)
+        partial = self._partial
+        sums["gaze"] += partial["gaze_sum"]
+        counts["gaze"] += partial["gaze_n"]
+        sums["posture"] += partial["posture_sum"]
+        counts["posture"] += partial["posture_n"]
+        for code, count in enumerate(partial["emotions"]):
+            emotions[code] += count
+
+        ranked = sorted((c for c in range(len(emotions)) if emotions[c]), key=lambda c: emotions[c], reverse=True)
+        recent_gaze = [round(v, 2) for v in self.windows.ordered("gaze")[-10:] if not math.isnan(v)]
+        return {
+            "frames": self.total_frames + partial["n"],
+            **{f"avg_{key}_score": round(sums[key] / counts[key], 3) for key in sums if counts[key]},
+            "top_emotions": [emotion_label(c) for c in ranked[:3]],
+            "recent_gaze_trend": recent_gaze,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "window_frames": self.window_frames,
+            "frames": self.frames.to_dict(),
+            "windows": self.windows.to_dict(),
+            "total_frames": self.total_frames,
+            "sums": self.sums,
+            "counts": self.counts,
+            "emotions": self.emotions,
+            "partial": self._partial,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TelemetryBuffer":
+        # Older snapshots predate the stored sizes and always used the defaults
+        buffer = cls(
+            capacity=data["frames"].get("capacity", 1024),
+            window_frames=data.get("window_frames", 30),
+            max_windows=data["windows"].get("capacity", 600),
+        )
+        buffer.frames.load(data["frames"])
+        buffer.windows.load(data["windows"])
+        buffer.total_frames = data["total_frames"]
+        buffer.sums = data["sums"]
+        buffer.counts = data["counts"]
+        buffer.emotions = data["emotions"]
+        buffer._partial = data["partial"]
+        return buffer
+
+    def _reset_partial(self) -> None:
+        self._partial = {
+            "t0": 0.0,
+            "t1": 0.0,
+            "n": 0,
+            "gaze_sum": 0.0,
+            "gaze_n": 0,
+            "posture_sum": 0.0,
+            "posture_n": 0,
+            "emotions": [0] * (OTHER_EMOTION + 1),
+        }
+
+    @staticmethod
+    def _window(partial: dict) -> dict:
+        emotions = {emotion_label(c): n for c, n in enumerate(partial["emotions"]) if n}
+        return {
+            "t0": partial["t0"],
+            "t1": partial["t1"],
+            "n": partial["n"],
+            "gaze": partial["gaze_sum"] / partial["gaze_n"] if partial["gaze_n"] else None,
+            "gaze_n": partial["gaze_n"],
+            "posture": partial["posture_sum"] / partial["posture_n"] if partial["posture_n"] else None,
+            "posture_n": partial["posture_n"],
+            "emotion": max(emotions, key=emotions.get) if emotions else None,
+            "emotions": emotions,
+        }
+
+
+def _seconds(timestamp: float | None) -> float:
+    if not isinstance(timestamp, (int, float)):
+        return time.time()
+    # Browsers send Date.now() in milliseconds
+    return timestamp / 1000 if timestamp > 1e11 else float(timestamp)
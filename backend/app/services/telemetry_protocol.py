@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import struct
+
+# Offered by the client in Sec-WebSocket-Protocol. Once it is accepted,
+# telemetry travels as binary frames while everything else stays JSON text.
+SUBPROTOCOL = "vantage.telemetry.v1"
+
+MSG_TELEMETRY_BATCH = 0x01
+MSG_TELEMETRY_ACK = 0x02
+
+# kind, sequence number of the batch's first frame, frame count
+BATCH_HEADER = struct.Struct("<BIH")
+# timestamp (s or ms), gaze, posture (NaN when missing), emotion code (-1 when missing)
+FRAME = struct.Struct("<dffb")
+# kind, total frames received on this connection
+ACK = struct.Struct("<BI")
+
+# The server acks after this many frames or this many seconds, whichever comes first
+ACK_EVERY_FRAMES = 150
+ACK_EVERY_S = 1.0
+
+
+def decode_batch(data: bytes) -> tuple[int, list[tuple[float, float, float, int]]]:
+    """Split a binary telemetry batch into (first sequence number, frames)."""
+    if len(data) < BATCH_HEADER.size:
+        raise ValueError("Truncated telemetry batch")
+    kind, first_seq, count = BATCH_HEADER.unpack_from(data)
+    if kind != MSG_TELEMETRY_BATCH:
+        raise ValueError(f"Unknown binary message kind {kind}")
+    body = memoryview(data)[BATCH_HEADER.size:]
+    if len(body) != count * FRAME.size:
+        raise ValueError("Telemetry batch length does not match its frame count")
+    return first_seq, list(FRAME.iter_unpack(body))
+
+
+def encode_batch(first_seq: int, frames: list[tuple[float, float, float, int]]) -> bytes:
+    return BATCH_HEADER.pack(MSG_TELEMETRY_BATCH, first_seq, len(frames)) + b"".join(FRAME.pack(*f) for f in frames)
+
+
+def encode_ack(received: int) -> bytes:
+    return ACK.pack(MSG_TELEMETRY_ACK, received & 0xFFFFFFFF)
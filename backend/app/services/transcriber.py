@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from app.services.audio_engine import SpeechAnalyzer
+
+# Whisper models expect 16 kHz mono float32
+WHISPER_RATE = 16000
+# Speech longer than this is cut into a new segment even without a pause
+MAX_SEGMENT_S = 20.0
+
+_model = None
+
+
+def _load_model(name: str) -> None:
+    # Runs once per worker process, so every later job hits a warm model
+    global _model
+    import whisper
+
+    _model = whisper.load_model(name, device="cpu")
+
+
+def _warm() -> bool:
+    return _model is not None
+
+
+def _transcribe(pcm: bytes) -> str:
+    audio = np.frombuffer(pcm, dtype=np.float32)
+    result = _model.transcribe(audio, fp16=False, condition_on_previous_text=False)
+    return str(result.get("text") or "").strip()
+
+
+class SpeechSegmenter:
+    """Energy-based voice activity detection over 16-bit PCM.
+
+    Audio is cut into 30 ms frames. A frame is speech when its RMS clears
+    both an absolute floor and a multiple of the running noise estimate.
+    A segment ends after `silence_ms` of non-speech or at MAX_SEGMENT_S.
+    While a segment is open, `feed` also offers its audio so far every
+    `partial_every_s`, which callers may transcribe for a partial result.
+    """
+
+    FRAME_MS = 30
+
+    def __init__(self, sample_rate: int = WHISPER_RATE, silence_ms: int = 600, partial_every_s: float = 2.0, min_rms: float = 0.01) -> None:
+        self.sample_rate = sample_rate
+        self.frame = WHISPER_RATE * self.FRAME_MS // 1000
+        self.silence_frames = max(1, silence_ms // self.FRAME_MS)
+        self.partial_frames = max(1, int(partial_every_s * 1000) // self.FRAME_MS)
+        self.max_frames = int(MAX_SEGMENT_S * 1000) // self.FRAME_MS
+        self.min_rms = min_rms
+        self.noise = min_rms
+        self._pending = np.empty(0, dtype=np.float32)
+        self._odd_byte = b""
+        self._speech: list[np.ndarray] = []
+        self._silent = 0
+        self._since_partial = 0
+        # Frames consumed so far, and the frame the open segment started at
+        self._position = 0
+        self._start = 0
+
+    def feed(self, data: bytes) -> list[tuple[str, np.ndarray, float]]:
+        """Consume a PCM chunk; returns ("partial" | "final", audio, start seconds) events in order."""
+        data = self._odd_byte + data
+        usable = len(data) - len(data) % 2
+        self._odd_byte = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        audio = np.concatenate((self._pending, self._resample(samples)))
+
+        whole = len(audio) // self.frame * self.frame
+        self._pending = audio[whole:]
+        frames = audio[:whole].reshape(-1, self.frame)
+        if not len(frames):
+            return []
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+
+        events: list[tuple[str, np.ndarray, float]] = []
+        for frame, level in zip(frames, rms):
+            self._position += 1
+            speech = level > max(self.min_rms, 3.0 * self.noise)
+            if not speech:
+                # Track the noise floor on non-speech frames only
+                self.noise = 0.95 * self.noise + 0.05 * float(level)
+            if not self._speech:
+                if speech:
+                    self._speech.append(frame)
+                    self._silent = 0
+                    self._start = self._position - 1
+                    self._since_partial = 1
+                continue
+
+            self._speech.append(frame)
+            self._silent = 0 if speech else self._silent + 1
+            self._since_partial += 1
+            if self._silent >= self.silence_frames or len(self._speech) >= self.max_frames:
+                events.append(("final", self._take(), self._start_s()))
+            elif self._since_partial >= self.partial_frames:
+                self._since_partial = 0
+                events.append(("partial", np.concatenate(self._speech), self._start_s()))
+        return events
+
+    def flush(self) -> tuple[np.ndarray, float] | None:
+        """Close any open segment, e.g. when the client stops recording."""
+        if not self._speech:
+            return None
+        return self._take(), self._start_s()
+
+    def _start_s(self) -> float:
+        return self._start * self.FRAME_MS / 1000
+
+    def _take(self) -> np.ndarray:
+        # Trailing silence adds nothing to the transcript
+        speech = self._speech[: len(self._speech) - self._silent] or self._speech
+        self._speech = []
+        self._silent = 0
+        return np.concatenate(speech)
+
+    def _resample(self, samples: np.ndarray) -> np.ndarray:
+        if self.sample_rate == WHISPER_RATE or not len(samples):
+            return samples
+        # Linear interpolation is plenty for speech recognition input
+        count = int(round(len(samples) * WHISPER_RATE / self.sample_rate))
+        positions = np.linspace(0, len(samples) - 1, count)
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+class TranscriptionPool:
+    """Whisper models preloaded in worker processes, shared by all audio streams.
+
+    At most `max_pending` segments are in the executor at once; further
+    callers wait on a semaphore instead of piling audio into its queue.
+    At most `max_streams` clients stream audio at once.
+    """
+
+    def __init__(self, model: str = "base", workers: int = 1, max_pending: int | None = None, max_streams: int = 8, max_queued: int = 4) -> None:
+        self.model = model
+        self.workers = max(1, workers)
+        self.max_streams = max_streams
+        self.max_queued = max_queued
+        self.active_streams = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(max_pending or 2 * self.workers)
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("whisper") is not None
+
+    async def start(self) -> None:
+        # spawn, not fork: the parent holds an event loop and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_model,
+            initargs=(self.model,),
+        )
+        loop = asyncio.get_running_loop()
+        # One job per worker starts every process and loads its model up front
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm) for _ in range(self.workers)))
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def open_stream(self, send: Callable[[str, dict], Awaitable[None]], sample_rate: int = WHISPER_RATE) -> "TranscriptionStream | None":
+        """A new stream, or None when `max_streams` are already open."""
+        if self.active_streams >= self.max_streams:
+            return None
+        self.active_streams += 1
+        return TranscriptionStream(self, send, sample_rate, self.max_queued)
+
+    async def transcribe(self, audio: np.ndarray) -> str:
+        if self._executor is None:
+            raise RuntimeError("Transcription pool is not running")
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, _transcribe, audio.astype(np.float32).tobytes())
+
+
+class TranscriptionStream:
+    """One client's audio: segments it, and transcribes segments in order.
+
+    Finished segments go through a bounded queue, so `feed` blocks once the
+    client is `max_queued` segments ahead of the pool; the socket reader
+    stops reading and TCP pushes back on the sender. Partial results are
+    best-effort and skipped whenever final segments are waiting.
+    """
+
+    def __init__(
+        self,
+        pool: TranscriptionPool,
+        send: Callable[[str, dict], Awaitable[None]],
+        sample_rate: int = WHISPER_RATE,
+        max_queued: int = 4,
+    ) -> None:
+        self.pool = pool
+        self.send = send
+        self.segmenter = SpeechSegmenter(sample_rate)
+        self.texts: list[str] = []
+        # Filler/pace stats for the current recording, fed one final segment at a time
+        self.speech = SpeechAnalyzer()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queued))
+        self._partial: np.ndarray | None = None
+        self._closed = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def feed(self, data: bytes) -> None:
+        for kind, audio, start in self.segmenter.feed(data):
+            if kind == "final":
+                self._partial = None
+                await self._queue.put((audio, start))
+            else:
+                # Only the newest partial matters; older ones are replaced
+                self._partial = (audio, start)
+                if self._queue.empty():
+                    self._queue.put_nowait(None)
+
+    async def finish(self) -> tuple[str, dict]:
+        """Transcribe whatever is buffered; returns the full transcript and its speech stats."""
+        segment = self.segmenter.flush()
+        if segment is not None:
+            self._partial = None
+            await self._queue.put(segment)
+        await self._queue.join()
+        # The next recording starts a fresh transcript
+        texts, self.texts = self.texts, []
+        speech, self.speech = self.speech, SpeechAnalyzer()
+        speech.flush()
+        return " ".join(t for t in texts if t), speech.summary()
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.pool.active_streams -= 1
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            segment = await self._queue.get()
+            try:
+                if segment is None:
+                    # A wake-up for a partial; skip it if finals arrived meanwhile
+                    partial, self._partial = self._partial, None
+                    if partial is not None and self._queue.empty():
+                        audio, start = partial
+                        text = await self.pool.transcribe(audio)
+                        # Partials are previewed against the finished segments, never folded in
+                        speech = self.speech.preview(text, start, start + len(audio) / WHISPER_RATE)
+                        await self.send("transcript_partial", {"segment": len(self.texts), "text": text, "speech": speech})
+                    continue
+                audio, start = segment
+                text = await self.pool.transcribe(audio)
+                self.texts.append(text)
+                self.speech.feed(text + " ", start, start + len(audio) / WHISPER_RATE)
+                await self.send(
+                    "transcript_final",
+                    {"segment": len(self.texts) - 1, "text": text, "speech": self.speech.summary()},
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Transcription Error: {e}")
+            finally:
+                self._queue.task_done()
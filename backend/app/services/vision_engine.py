@@ -1,5 +1,39 @@
 from __future__ import annotations
 
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.services.telemetry_buffer import EMOTIONS, OTHER_EMOTION, TelemetryBuffer
+
+# Gaze scores below this count as broken eye contact
+EYE_CONTACT_THRESHOLD = 0.4
+# Sliding window for rolling stats, in frames; must not exceed the ring capacity
+WINDOW_FRAMES = 300
+# Frames this many standard deviations from the window mean are anomalies
+ANOMALY_Z = 3.0
+MIN_FRAMES_FOR_ANOMALIES = 30
+METRICS = ("gaze", "posture")
+
+
+@dataclass
+class VisionState:
+    """Incremental analytics for one session; rebuilt from the ring buffer if lost."""
+
+    # Rows of the frame ring folded in so far, and the first row still in the window
+    processed: int = 0
+    window_start: int = 0
+    # Per metric over the sliding window: [non-NaN count, sum, sum of squares]
+    window: dict[str, np.ndarray] = field(default_factory=lambda: {m: np.zeros(3) for m in METRICS})
+    window_below: int = 0
+    gaze_frames: int = 0
+    below_frames: int = 0
+    last_emotion: int = -1
+    transitions: np.ndarray = field(default_factory=lambda: np.zeros((OTHER_EMOTION + 1, OTHER_EMOTION + 1), dtype=np.int64))
+    anomalies: int = 0
+    recent_anomalies: deque = field(default_factory=lambda: deque(maxlen=20))
+
 
 class VisionEngine:
     def __init__(self) -> None:
@@ -15,3 +49,109 @@ class VisionEngine:
             "posture_score": posture_score,
             "emotion": emotion,
         }
+
+    def update(self, buffer: TelemetryBuffer, state: VisionState) -> None:
+        """Fold the frames added to `buffer` since the last call into `state`.
+
+        Work is proportional to the number of new frames: the sliding window
+        is maintained by adding the frames entering it and subtracting the
+        ones leaving, both read straight from the ring's arrays.
+        """
+        ring = buffer.frames
+        if ring.count <= state.processed:
+            return
+        if ring.count - state.window_start > ring.size:
+            # Rows the window would subtract are already overwritten (a restored
+            # session, or a very large batch): restart the window from the ring
+            state.processed = state.window_start = max(state.processed, ring.count - ring.size)
+            state.window = {name: np.zeros(3) for name in METRICS}
+            state.window_below = 0
+
+        entering = self._rows(ring, state.processed, ring.count - state.processed)
+        window_start = max(state.window_start, ring.count - WINDOW_FRAMES)
+        leaving = self._rows(ring, state.window_start, window_start - state.window_start)
+        columns = {name: np.frombuffer(ring.columns[name], dtype=np.float32) for name in METRICS}
+        timestamps = np.frombuffer(ring.columns["t"], dtype=np.float64)
+
+        # Anomalies are judged against the window as it stood before these frames
+        for name in METRICS:
+            n, total, squares = state.window[name]
+            values = columns[name][entering]
+            if n >= MIN_FRAMES_FOR_ANOMALIES:
+                mean = total / n
+                std = np.sqrt(max(squares / n - mean * mean, 1e-6))
+                outliers = np.flatnonzero(np.abs(values - mean) > ANOMALY_Z * std)
+                state.anomalies += len(outliers)
+                for i in outliers[-state.recent_anomalies.maxlen:]:
+                    state.recent_anomalies.append(
+                        {"t": float(timestamps[entering[i]]), "metric": name, "value": round(float(values[i]), 3)}
+                    )
+
+        for name in METRICS:
+            added = columns[name][entering].astype(np.float64)
+            removed = columns[name][leaving].astype(np.float64)
+            added = added[~np.isnan(added)]
+            removed = removed[~np.isnan(removed)]
+            state.window[name] += (
+                len(added) - len(removed),
+                added.sum() - removed.sum(),
+                (added * added).sum() - (removed * removed).sum(),
+            )
+
+        gaze_in = columns["gaze"][entering]
+        gaze_out = columns["gaze"][leaving]
+        below_in = int(np.count_nonzero(gaze_in < EYE_CONTACT_THRESHOLD))
+        state.window_below += below_in - int(np.count_nonzero(gaze_out < EYE_CONTACT_THRESHOLD))
+        state.gaze_frames += int(np.count_nonzero(~np.isnan(gaze_in)))
+        state.below_frames += below_in
+
+        codes = np.frombuffer(ring.columns["emotion"], dtype=np.int8)[entering].astype(np.int64)
+        codes = codes[codes >= 0]
+        if len(codes):
+            sequence = np.concatenate(([state.last_emotion], codes)) if state.last_emotion >= 0 else codes
+            changed = sequence[1:] != sequence[:-1]
+            np.add.at(state.transitions, (sequence[:-1][changed], sequence[1:][changed]), 1)
+            state.last_emotion = int(codes[-1])
+
+        state.processed = ring.count
+        state.window_start = window_start
+
+    def summary(self, state: VisionState) -> dict:
+        stats: dict = {}
+        for name in METRICS:
+            n, total, squares = state.window[name]
+            if n > 0:
+                mean = total / n
+                stats[f"{name}_mean"] = round(float(mean), 3)
+                stats[f"{name}_variance"] = round(float(max(squares / n - mean * mean, 0.0)), 4)
+
+        gaze_n = state.window["gaze"][0]
+        stats["eye_contact_below_fraction"] = round(state.below_frames / state.gaze_frames, 3) if state.gaze_frames else None
+        stats["window_eye_contact_below_fraction"] = round(state.window_below / gaze_n, 3) if gaze_n else None
+
+        labels = [*EMOTIONS, "other"]
+        pairs = np.argwhere(state.transitions > 0)
+        ranked = sorted(pairs.tolist(), key=lambda p: state.transitions[p[0], p[1]], reverse=True)[:5]
+        stats["emotion_transitions"] = {f"{labels[a]}->{labels[b]}": int(state.transitions[a, b]) for a, b in ranked}
+        stats["total_emotion_transitions"] = int(state.transitions.sum())
+        stats["anomalies"] = state.anomalies
+        stats["recent_anomalies"] = list(state.recent_anomalies)[-5:]
+
+        alerts = []
+        below = stats["eye_contact_below_fraction"]
+        if below is not None and below > 0.4:
+            alerts.append(f"Eye contact drops below {int(EYE_CONTACT_THRESHOLD * 100)}% for {round(below * 100)}% of the session.")
+        if stats.get("posture_variance", 0.0) > 0.05:
+            alerts.append("Posture shifts frequently.")
+        stats["alerts"] = alerts
+        return stats
+
+    @staticmethod
+    def _rows(ring, start: int, length: int) -> np.ndarray:
+        """Ring indices of rows start..start+length-1, counted in rows ever appended."""
+        if length <= 0:
+            return np.empty(0, dtype=np.int64)
+        # Row r lives at (head - (count - r)) mod capacity
+        first = ring.head - (ring.count - start)
+        return (first + np.arange(length)) % ring.capacity
+
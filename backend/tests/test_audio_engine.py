@@ -0,0 +1,82 @@
+from app.services.audio_engine import FILLERS, AudioEngine, PhraseAutomaton, SpeechAnalyzer
+
+
+def _matches(automaton, text):
+    node, found = 0, []
+    for word in text.split():
+        node = automaton.step(node, word)
+        found.extend(automaton.output[node])
+    return found
+
+
+def test_automaton_matches_whole_word_phrases_only():
+    assert _matches(FILLERS, "so you know i mean um") == ["you know", "i mean", "um"]
+    assert _matches(FILLERS, "you said you know") == ["you know"]
+    # Parts of a phrase, or words that merely contain a filler, don't count
+    assert _matches(FILLERS, "you knew what i meant umbrella") == []
+
+
+def test_automaton_overlapping_phrases_via_fail_links():
+    automaton = PhraseAutomaton(("a b c", "b c", "c", "b b"))
+    assert sorted(_matches(automaton, "a b c")) == ["a b c", "b c", "c"]
+    assert _matches(automaton, "a b b c") == ["b b", "b c", "c"]
+
+
+def test_automaton_empty():
+    automaton = PhraseAutomaton(())
+    assert _matches(automaton, "anything at all") == []
+
+
+def test_analyzer_counts_fillers_split_across_chunks():
+    text = "Um, so I think, you know, the answer is uh a hash map. I mean it works."
+    whole = SpeechAnalyzer()
+    whole.feed(text)
+    whole.flush()
+    expected = whole.summary()
+    assert expected["fillers"] == {"um": 1, "you know": 1, "uh": 1, "i mean": 1}
+    assert expected["words"] == 17
+
+    # Every cut point, including mid-word and between the words of a phrase
+    for cut in range(len(text)):
+        analyzer = SpeechAnalyzer()
+        analyzer.feed(text[:cut])
+        analyzer.feed(text[cut:])
+        analyzer.flush()
+        assert analyzer.summary() == expected
+
+
+def test_analyzer_empty_input():
+    analyzer = SpeechAnalyzer()
+    analyzer.feed("")
+    analyzer.flush()
+    assert analyzer.summary() == {"fluency": 1.0, "filler_count": 0, "fillers": {}, "words": 0, "notes": []}
+
+
+def test_analyzer_pace_and_pauses():
+    analyzer = SpeechAnalyzer()
+    analyzer.feed("one two three four five ", 0.0, 2.0)
+    analyzer.feed("six seven eight nine ten ", 2.3, 4.0)
+    analyzer.feed("eleven twelve ", 9.0, 10.0)
+    stats = analyzer.summary()
+    assert stats["words"] == 12
+    assert stats["wpm"] == round(12 * 60 / 4.7, 1)
+    assert stats["pauses"]["count"] == 2
+    assert stats["pauses"]["longest_s"] == 5.0
+    assert stats["pauses"]["histogram"] == {"0-0.5s": 1, "0.5-1s": 0, "1-2s": 0, "2-4s": 0, "4s+": 1}
+    assert "Long pauses (over 4s)" in stats["notes"]
+
+
+def test_preview_leaves_the_analyzer_untouched():
+    analyzer = SpeechAnalyzer()
+    analyzer.feed("um so ", 0.0, 1.0)
+    before = analyzer.summary()
+    preview = analyzer.preview("uh like you know", 1.0, 2.0)
+    assert preview["fillers"] == {"um": 1, "uh": 1, "you know": 1}
+    assert analyzer.summary() == before
+
+
+def test_analyze_transcript():
+    stats = AudioEngine().analyze_transcript("um um um hello")
+    assert stats["filler_count"] == 3
+    assert stats["fluency"] == 0.25
+    assert stats["notes"] == ["High filler-word usage"]
@@ -0,0 +1,50 @@
+import math
+
+from app.services.complexity import fit_complexity, fit_space, is_slower_than
+
+SIZES = [64, 128, 256, 512, 1024, 2048]
+
+
+def test_fit_complexity_recognizes_each_class():
+    assert fit_complexity([(n, 5e-6) for n in SIZES]) == "O(1)"
+    assert fit_complexity([(n, 2e-7 * n) for n in SIZES]) == "O(n)"
+    assert fit_complexity([(n, 1e-9 * n * n) for n in SIZES]) == "O(n^2)"
+    assert fit_complexity([(n, 1e-12 * n ** 3) for n in SIZES]) == "O(n^3)"
+
+
+def test_fit_complexity_tolerates_timer_noise():
+    noise = [1.1, 0.92, 1.05, 0.97, 1.08, 0.95]
+    samples = [(n, 1e-9 * n * n * k) for n, k in zip(SIZES, noise)]
+    assert fit_complexity(samples) == "O(n^2)"
+
+
+def test_fit_complexity_separates_n_log_n_from_n():
+    samples = [(n, 1e-8 * n * math.log2(n)) for n in (16, 256, 4096, 65536)]
+    assert fit_complexity(samples) == "O(n log n)"
+
+
+def test_fit_complexity_prefers_cheaper_class_within_tolerance():
+    # Linear with a slight upward drift, as cache effects produce, is still O(n)
+    samples = [(n, 2e-7 * n * (1 + 0.02 * i)) for i, n in enumerate(SIZES)]
+    assert fit_complexity(samples) == "O(n)"
+
+
+def test_fit_complexity_needs_three_usable_points():
+    assert fit_complexity([]) is None
+    assert fit_complexity([(100, 1.0), (200, 2.0)]) is None
+    # n <= 1 and zero timings are discarded before fitting
+    assert fit_complexity([(1, 1.0), (100, 0.0), (200, 2.0), (400, 4.0)]) is None
+
+
+def test_fit_space_treats_small_peaks_as_constant():
+    assert fit_space([(n, 1024.0) for n in SIZES]) == "O(1)"
+    assert fit_space([(n, 64.0 * n) for n in SIZES]) == "O(n)"
+    assert fit_space([(64, 1.0), (128, 2.0)]) is None
+
+
+def test_is_slower_than():
+    assert is_slower_than("O(n^2)", "O(n)")
+    assert not is_slower_than("O(n)", "O(n)")
+    assert not is_slower_than("O(log n)", "O(n)")
+    assert not is_slower_than(None, "O(n)")
+    assert not is_slower_than("O(n)", "unknown")
@@ -0,0 +1,82 @@
+import json
+
+from app.services.json_stream import IncrementalJsonArrayParser, IncrementalJsonObjectParser
+
+REPLY = '```json\n{"score": 7, "feedback": "Good, but \\"why\\"? {not nested}", "tags": ["a", {"b": [1, 2]}], "ok": true}\n```'
+QUESTIONS = 'Sure! {"questions": ["Reverse a list, in place.", "What is \\"CAP\\"?", ["x", "]"]]}'
+
+
+def _feed_in_chunks(parser, text, size):
+    completed = []
+    for i in range(0, len(text), size):
+        out = parser.feed(text[i:i + size])
+        completed.extend(out.items() if isinstance(out, dict) else out)
+    return completed
+
+
+def test_object_parser_whole_reply():
+    parser = IncrementalJsonObjectParser()
+    parser.feed(REPLY)
+    assert parser.result == json.loads(REPLY.strip("`").removeprefix("json\n"))
+
+
+def test_object_parser_emits_members_as_they_complete():
+    parser = IncrementalJsonObjectParser()
+    assert parser.feed('{"score": 7, "feed') == {"score": 7}
+    assert parser.feed('back": "ok"') == {}
+    assert parser.feed("}") == {"feedback": "ok"}
+
+
+def test_object_parser_every_chunk_boundary():
+    expected = list(json.loads(REPLY.strip("`").removeprefix("json\n")).items())
+    for size in (1, 2, 3, 7, 16):
+        assert _feed_in_chunks(IncrementalJsonObjectParser(), REPLY, size) == expected
+    # Splits at every position, including inside escapes and between "\" and the quote
+    for cut in range(len(REPLY)):
+        parser = IncrementalJsonObjectParser()
+        parser.feed(REPLY[:cut])
+        parser.feed(REPLY[cut:])
+        assert list(parser.result.items()) == expected
+
+
+def test_object_parser_empty_and_garbage_input():
+    parser = IncrementalJsonObjectParser()
+    assert parser.feed("") == {}
+    assert parser.feed("no json here") == {}
+    assert parser.feed("{}") == {}
+    assert parser.result == {}
+    # A malformed member is skipped; the rest still parse
+    parser = IncrementalJsonObjectParser()
+    parser.feed('{"a": nope, "b": 2}')
+    assert parser.result == {"b": 2}
+
+
+def test_object_parser_ignores_text_after_the_object():
+    parser = IncrementalJsonObjectParser()
+    parser.feed('{"a": 1} {"b": 2}')
+    assert parser.result == {"a": 1}
+
+
+def test_array_parser_every_chunk_boundary():
+    expected = ["Reverse a list, in place.", 'What is "CAP"?', ["x", "]"]]
+    for cut in range(len(QUESTIONS)):
+        parser = IncrementalJsonArrayParser()
+        parser.feed(QUESTIONS[:cut])
+        parser.feed(QUESTIONS[cut:])
+        assert parser.items == expected
+    assert _feed_in_chunks(IncrementalJsonArrayParser(), QUESTIONS, 1) == expected
+
+
+def test_array_parser_emits_elements_as_they_complete():
+    parser = IncrementalJsonArrayParser()
+    assert parser.feed('["one", "tw') == ["one"]
+    assert parser.feed('o"') == []
+    assert parser.feed("]") == ["two"]
+    assert parser.feed(', "three"]') == []
+
+
+def test_array_parser_empty_input():
+    parser = IncrementalJsonArrayParser()
+    assert parser.feed("") == []
+    assert parser.feed('{"questions": []}') == []
+    assert parser.items == []
@@ -0,0 +1,58 @@
+from app.services.recon_context import CHARS_PER_TOKEN, Bm25, build_context
+
+
+def _hit(title, body, href=None):
+    return {"title": title, "body": body, "href": href or f"https://example.com/{abs(hash(title))}"}
+
+
+def test_bm25_ranks_term_matches_and_penalizes_long_docs():
+    bm25 = Bm25([["python", "django"], ["python"] + ["filler"] * 20, ["rust"]])
+    query = ["python"]
+    assert bm25.score(query, 0) > bm25.score(query, 1) > 0
+    assert bm25.score(query, 2) == 0.0
+    # Rare terms weigh more than common ones
+    assert bm25.score(["rust"], 2) > bm25.score(["python"], 0)
+
+
+def test_bm25_empty_corpus_and_query():
+    assert Bm25([]).avg_length == 0.0
+    bm25 = Bm25([[]])
+    assert bm25.score(["python"], 0) == 0.0
+    assert Bm25([["a"]]).score([], 0) == 0.0
+
+
+def test_build_context_empty_input():
+    assert build_context({}, "Acme", 100) == {}
+    sections = {"tech_stack": None, "values": [], "news": [{"title": "", "body": ""}]}
+    assert build_context(sections, "Acme", 100) == {"tech_stack": "No results", "values": "No results", "news": "No results"}
+
+
+def test_build_context_deduplicates_across_searches():
+    page = _hit("Acme engineering", "Acme builds its backend in Go with Postgres and Kafka.", "https://acme.dev/blog/")
+    same_url = dict(page, href="https://acme.dev/blog")
+    same_text = dict(page, href="https://mirror.example/acme", body="  Acme builds its BACKEND in Go with Postgres and Kafka ")
+    context = build_context({"tech_stack": [page, same_text], "news": [same_url]}, "Acme", 200)
+    text = "\n".join(context.values())
+    assert text.count("Postgres") == 1
+    assert "https://" not in text
+
+
+def test_build_context_moves_snippets_to_their_best_section():
+    values_page = _hit("Acme culture", "Our values and leadership principles shape the culture and mission.")
+    stack_page = _hit("Acme stack", "Backend frameworks, languages, cloud infrastructure and database tools.")
+    # Both came back from the tech stack search
+    context = build_context({"tech_stack": [values_page, stack_page], "values": []}, "Acme", 200)
+    assert "frameworks" in context["tech_stack"]
+    assert "principles" in context["values"]
+    assert "principles" not in context["tech_stack"]
+
+
+def test_build_context_respects_the_token_budget():
+    hits = [_hit(f"Acme interview {i}", "interview questions coding rounds system design onsite " * 10) for i in range(20)]
+    tokens = 60
+    context = build_context({"interview": hits}, "Acme", tokens)
+    assert context["interview"] != "No results"
+    assert len(context["interview"]) <= tokens * CHARS_PER_TOKEN
+    # A single oversized snippet is cut to at most half the budget
+    assert all(len(line) <= tokens * CHARS_PER_TOKEN // 2 + 3 for line in context["interview"].splitlines())
+
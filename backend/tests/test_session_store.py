@@ -0,0 +1,172 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.interview_session import InterviewSession, QuestionQueue
+from app.services.session_store import LOG_FLUSH_EVERY, DiskSessionStore
+
+
+def _question(i):
+    return {"op": "question", "question": {"id": f"q{i}", "prompt": f"Question {i}?"}}
+
+
+def _event(i):
+    return {"op": "event", "event": {"type": "answer", "n": i}}
+
+
+def _new_session(store, session_id="s1"):
+    session = InterviewSession(session_id=session_id, questions=QuestionQueue(), spec={"role": "backend"})
+    store.create(session)
+    return session
+
+
+def _state(session):
+    snapshot = session.snapshot()
+    snapshot.pop("telemetry")
+    return snapshot
+
+
+def test_restart_replays_snapshot_and_log(tmp_path):
+    store = DiskSessionStore(tmp_path)
+    session = _new_session(store)
+    for i in range(3):
+        store.record(session, _question(i))
+    store.record(session, {"op": "questions_closed"}, durable=True)
+    store.record(session, {"op": "advance"}, durable=True)
+    store.record(session, {"op": "summary", "summary": "went well"}, durable=True)
+
+    restored = DiskSessionStore(tmp_path).get("s1")
+    assert _state(restored) == _state(session)
+    assert restored.seq == 6
+    assert restored.current_question.id == "q1"
+
+
+def test_buffered_records_reach_disk_in_batches(tmp_path):
+    store = DiskSessionStore(tmp_path)
+    session = _new_session(store)
+    for i in range(LOG_FLUSH_EVERY - 1):
+        store.record(session, _event(i))
+    assert not (tmp_path / "s1.log").exists()
+    store.record(session, _event(LOG_FLUSH_EVERY - 1))
+    assert len((tmp_path / "s1.log").read_text().splitlines()) == LOG_FLUSH_EVERY
+
+
+def test_log_is_folded_into_a_snapshot(tmp_path):
+    store = DiskSessionStore(tmp_path, snapshot_every=5)
+    session = _new_session(store)
+    for i in range(12):
+        store.record(session, _event(i), durable=True)
+    # Two snapshots so far; only the two records since the last are in the log
+    assert len((tmp_path / "s1.log").read_text().splitlines()) == 2
+    assert json.loads((tmp_path / "s1.json").read_text())["seq"] == 10
+    assert len(DiskSessionStore(tmp_path).get("s1").events) == 12
+
+
+def test_replay_skips_records_the_snapshot_covers(tmp_path):
+    store = DiskSessionStore(tmp_path)
+    session = _new_session(store)
+    store.record(session, _event(0), durable=True)
+    stale_log = (tmp_path / "s1.log").read_text()
+    store.close()
+    # A crash between writing the snapshot and removing the log leaves the old log behind
+    (tmp_path / "s1.log").write_text(stale_log)
+    assert len(DiskSessionStore(tmp_path).get("s1").events) == 1
+
+
+def test_replay_stops_at_a_torn_final_line(tmp_path):
+    store = DiskSessionStore(tmp_path)
+    session = _new_session(store)
+    for i in range(3):
+        store.record(session, _event(i), durable=True)
+    with open(tmp_path / "s1.log", "a", encoding="utf-8") as fh:
+        fh.write('{"seq": 4, "op": "event", "ev')
+
+    store = DiskSessionStore(tmp_path)
+    restored = store.get("s1")
+    assert [e["n"] for e in restored.events] == [0, 1, 2]
+    assert restored.seq == 3
+
+    # Records written after the reload must survive the next restart too
+    for i in range(3, 6):
+        store.record(restored, _event(i), durable=True)
+    assert [e["n"] for e in DiskSessionStore(tmp_path).get("s1").events] == [0, 1, 2, 3, 4, 5]
+
+
+def test_replay_stops_at_a_corrupted_line(tmp_path):
+    store = DiskSessionStore(tmp_path)
+    session = _new_session(store)
+    for i in range(4):
+        store.record(session, _event(i), durable=True)
+    lines = (tmp_path / "s1.log").read_text().splitlines()
+    lines[2] = "\x00\x00garbage"
+    (tmp_path / "s1.log").write_text("\n".join(lines) + "\n")
+
+    # Nothing after the damage is applied, so the session stays a consistent prefix
+    store = DiskSessionStore(tmp_path)
+    restored = store.get("s1")
+    assert [e["n"] for e in restored.events] == [0, 1]
+    store.record(restored, _event(4), durable=True)
+    assert [e["n"] for e in DiskSessionStore(tmp_path).get("s1").events] == [0, 1, 4]
+
+
+def test_empty_log_and_unknown_session(tmp_path):
+    store = DiskSessionStore(tmp_path)
+    _new_session(store)
+    (tmp_path / "s1.log").write_text("")
+    assert DiskSessionStore(tmp_path).get("s1").seq == 0
+    with pytest.raises(KeyError):
+        store.get("missing")
+
+
+def test_evicted_sessions_reload_and_leave_no_counters(tmp_path):
+    store = DiskSessionStore(tmp_path, max_sessions=2)
+    for i in range(5):
+        session = _new_session(store, f"s{i}")
+        store.record(session, _event(i))
+    assert len(store._sessions) == 2
+    assert set(store._logged) <= set(store._sessions)
+    assert set(store._buffers) <= set(store._sessions)
+
+    # Buffered records were snapshotted on eviction, not lost
+    assert store.get("s0").events == [{"type": "answer", "n": 0}]
+    store.close()
+    assert store._logged == {} and store._buffers == {}
+
+
+def test_async_methods_persist_in_order(tmp_path):
+    async def run():
+        store = DiskSessionStore(tmp_path, snapshot_every=7)
+        session = InterviewSession(session_id="s1", questions=QuestionQueue())
+        await store.acreate(session)
+        for i in range(20):
+            await store.arecord(session, _event(i), durable=i % 3 == 0)
+        await store.aclose()
+
+        store = DiskSessionStore(tmp_path)
+        # Concurrent lookups after a restart share one load and one session object
+        first, second = await asyncio.gather(store.aget("s1"), store.aget("s1"))
+        assert first is second
+        assert [e["n"] for e in first.events] == list(range(20))
+        with pytest.raises(KeyError):
+            await store.aget("missing")
+        await store.aclose()
+
+    asyncio.run(run())
+
+
+def test_async_load_folds_a_torn_log(tmp_path):
+    store = DiskSessionStore(tmp_path)
+    session = _new_session(store)
+    store.record(session, _event(0), durable=True)
+    with open(tmp_path / "s1.log", "a", encoding="utf-8") as fh:
+        fh.write('{"seq": 2, "op"')
+
+    async def run():
+        store = DiskSessionStore(tmp_path)
+        restored = await store.aget("s1")
+        await store.arecord(restored, _event(1), durable=True)
+        await store.aclose()
+
+    asyncio.run(run())
+    assert [e["n"] for e in DiskSessionStore(tmp_path).get("s1").events] == [0, 1]
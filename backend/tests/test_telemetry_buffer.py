@@ -0,0 +1,112 @@
+import json
+import math
+
+from app.services.telemetry_buffer import NO_EMOTION, OTHER_EMOTION, TelemetryBuffer, _Ring, emotion_code, emotion_label
+
+
+def _ring(capacity):
+    return _Ring({"v": ("d", 0.0)}, capacity)
+
+
+def test_ring_keeps_newest_rows_in_order_across_wraparound():
+    ring = _ring(4)
+    for value in range(10):
+        ring.append(v=value)
+        expected = list(range(max(0, value - 3), value + 1))
+        assert list(ring.ordered("v")) == expected
+    assert ring.size == 4
+    assert ring.count == 10
+
+
+def test_ring_empty():
+    ring = _ring(3)
+    assert list(ring.ordered("v")) == []
+    assert ring.size == ring.count == 0
+
+
+def test_ring_round_trips_through_dict():
+    ring = _ring(3)
+    for value in range(5):
+        ring.append(v=value)
+    restored = _ring(3)
+    restored.load(json.loads(json.dumps(ring.to_dict())))
+    assert list(restored.ordered("v")) == [2, 3, 4]
+    assert (restored.size, restored.head, restored.count) == (3, ring.head, 5)
+
+
+def test_emotion_codes():
+    assert emotion_label(emotion_code("Happy")) == "happy"
+    assert emotion_code("bored") == OTHER_EMOTION
+    assert emotion_label(OTHER_EMOTION) == "other"
+    assert emotion_code(None) == NO_EMOTION
+    assert emotion_label(NO_EMOTION) is None
+    assert emotion_code(99) == OTHER_EMOTION
+
+
+def test_buffer_emits_a_window_every_window_frames():
+    buffer = TelemetryBuffer(capacity=8, window_frames=3)
+    windows = [buffer.add(1000.0 + i, 0.5, None, "happy" if i % 3 else "sad") for i in range(7)]
+    assert [w is not None for w in windows] == [False, False, True, False, False, True, False]
+    window = windows[2]
+    assert window["n"] == 3
+    assert window["gaze"] == 0.5 and window["gaze_n"] == 3
+    assert window["posture"] is None and window["posture_n"] == 0
+    assert window["emotion"] == "happy"
+    assert window["emotions"] == {"happy": 2, "sad": 1}
+
+
+def test_buffer_raw_frames_are_capped_but_totals_are_not():
+    buffer = TelemetryBuffer(capacity=4, window_frames=2)
+    for i in range(10):
+        window = buffer.add(i, i / 10, 1.0, "neutral")
+        if window:
+            buffer.add_window(window)
+    assert buffer.frames.size == 4
+    assert list(buffer.frames.ordered("t")) == [6, 7, 8, 9]
+    summary = buffer.as_dict()
+    assert summary["frames"] == 10
+    assert math.isclose(summary["avg_gaze_score"], 0.45)
+    assert summary["top_emotions"] == ["neutral"]
+
+
+def test_buffer_summary_includes_the_open_window():
+    buffer = TelemetryBuffer(window_frames=30)
+    buffer.add(1.0, 1.0, None, "angry")
+    summary = buffer.as_dict()
+    assert summary["frames"] == 1
+    assert summary["avg_gaze_score"] == 1.0
+    assert "avg_posture_score" not in summary
+    assert summary["top_emotions"] == ["angry"]
+
+
+def test_empty_buffer_summary():
+    assert TelemetryBuffer().as_dict() == {"frames": 0, "top_emotions": [], "recent_gaze_trend": []}
+
+
+def test_replaying_windows_reproduces_the_totals():
+    live = TelemetryBuffer(window_frames=5)
+    windows = []
+    for i in range(23):
+        window = live.add(i, (i % 7) / 7, (i % 3) / 3, ["happy", "sad", None][i % 3])
+        if window:
+            live.add_window(window)
+            windows.append(json.loads(json.dumps(window)))
+
+    replayed = TelemetryBuffer(window_frames=5)
+    for window in windows:
+        replayed.add_window(window)
+    assert replayed.total_frames == live.total_frames == 20
+    assert replayed.sums == live.sums
+    assert replayed.counts == live.counts
+    assert replayed.emotions == live.emotions
+
+
+def test_buffer_round_trips_through_dict():
+    buffer = TelemetryBuffer(capacity=8, window_frames=3)
+    for i in range(11):
+        window = buffer.add(i, 0.25, 0.75, "surprised")
+        if window:
+            buffer.add_window(window)
+    restored = TelemetryBuffer.from_dict(json.loads(json.dumps(buffer.to_dict())))
+    assert restored.as_dict() == buffer.as_dict()
+    assert list(restored.frames.ordered("t")) == list(buffer.frames.ordered("t"))
@@ -0,0 +1,88 @@
+import math
+import struct
+
+import pytest
+
+from app.services.telemetry_buffer import TelemetryBuffer
+from app.services.telemetry_protocol import (
+    ACK,
+    BATCH_HEADER,
+    FRAME,
+    MSG_TELEMETRY_ACK,
+    MSG_TELEMETRY_BATCH,
+    decode_batch,
+    encode_ack,
+    encode_batch,
+)
+
+FRAMES = [
+    (1_700_000_000_123.0, 0.5, 0.25, 1),
+    (1_700_000_000_223.0, math.nan, 0.75, -1),
+    (1_700_000_000_323.0, 1.0, math.nan, 7),
+]
+
+
+def _same(a, b):
+    return all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+def test_wire_sizes_are_fixed():
+    # Clients pack these by hand; changing a size breaks every client
+    assert (BATCH_HEADER.size, FRAME.size, ACK.size) == (7, 17, 5)
+
+
+def test_batch_round_trip():
+    data = encode_batch(42, FRAMES)
+    assert len(data) == BATCH_HEADER.size + len(FRAMES) * FRAME.size
+    first_seq, frames = decode_batch(data)
+    assert first_seq == 42
+    assert len(frames) == len(FRAMES)
+    assert all(_same(got, sent) for got, sent in zip(frames, FRAMES))
+
+
+def test_empty_batch_round_trip():
+    assert decode_batch(encode_batch(0, [])) == (0, [])
+
+
+def test_decoded_frames_feed_the_ring_buffer():
+    buffer = TelemetryBuffer(window_frames=3)
+    _, frames = decode_batch(encode_batch(0, FRAMES))
+    window = None
+    for frame in frames:
+        window = buffer.add(*frame)
+    assert window["n"] == 3
+    assert window["gaze"] == 0.75 and window["gaze_n"] == 2
+    assert window["emotions"] == {"happy": 1, "other": 1}
+
+
+@pytest.mark.parametrize("cut", [0, 1, BATCH_HEADER.size - 1])
+def test_truncated_header_is_rejected(cut):
+    with pytest.raises(ValueError, match="Truncated"):
+        decode_batch(encode_batch(0, FRAMES)[:cut])
+
+
+@pytest.mark.parametrize("delta", [-FRAME.size, -1, 1, FRAME.size])
+def test_body_length_must_match_the_frame_count(delta):
+    data = encode_batch(0, FRAMES)
+    data = data[:delta] if delta < 0 else data + b"\x00" * delta
+    with pytest.raises(ValueError, match="frame count"):
+        decode_batch(data)
+
+
+def test_header_count_mismatch_is_rejected():
+    body = encode_batch(0, FRAMES)[BATCH_HEADER.size:]
+    with pytest.raises(ValueError, match="frame count"):
+        decode_batch(BATCH_HEADER.pack(MSG_TELEMETRY_BATCH, 0, len(FRAMES) + 1) + body)
+
+
+def test_wrong_message_kind_is_rejected():
+    with pytest.raises(ValueError, match="kind"):
+        decode_batch(encode_ack(10) + b"\x00\x00")
+    with pytest.raises(ValueError, match="kind"):
+        decode_batch(b"\xff" + encode_batch(0, FRAMES)[1:])
+
+
+def test_ack_encoding():
+    assert struct.unpack("<BI", encode_ack(150)) == (MSG_TELEMETRY_ACK, 150)
+    # The counter is 32-bit on the wire and wraps rather than failing
+    assert struct.unpack("<BI", encode_ack(2**32 + 5)) == (MSG_TELEMETRY_ACK, 5)
@@ -1,4 +1,4 @@
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import Editor from '@monaco-editor/react';
 import { 
   Play, 
@@ -17,7 +17,7 @@ import {
   FileText
 } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
-import { executeCode } from '../services/api';
+import { submitCodeJob, cancelCodeJob, openCodeJobSocket } from '../services/api';
 
 export default function CodeDojo() {
   const navigate = useNavigate();
@@ -48,6 +48,58 @@ def invertTree(root: TreeNode) -> TreeNode:
     { id: 3, input: "root = []", expected: "[]", status: "pending" },
   ]);
 
+  // The job being run and the socket its results stream over
+  const jobRef = useRef(null);
+
+  // Leaving the page stops a run nobody will see
+  useEffect(() => () => {
+    const job = jobRef.current;
+    jobRef.current = null;
+    if (job) {
+      job.socket.close();
+      cancelCodeJob(job.id).catch(() => {});
+    }
+  }, []);
+
+  const finishJob = () => {
+    const job = jobRef.current;
+    jobRef.current = null;
+    job?.socket.close();
+    setIsRunning(false);
+  };
+
+  const showResult = (result) => {
+    if (result.error) {
+      setOutput(result.error);
+      // Mark all as failed if system error
+      setTestCases(prev => prev.map(tc => ({ ...tc, status: "failed" })));
+      return;
+    }
+    // Update test cases based on result
+    setTestCases(prev => prev.map(tc => {
+      const res = result.results.find(r => r.id === tc.id);
+      return {
+        ...tc,
+        status: res?.passed ? "passed" : "failed",
+        actual: res?.actual
+      };
+    }));
+
+    const passedCount = result.results.filter(r => r.passed).length;
+    const totalCount = result.results.length;
+
+    let outMsg = "";
+    if (result.output) {
+         outMsg += `Output:\n${result.output}\n\n`;
+    }
+    outMsg += `Test Run Completed: ${passedCount}/${totalCount} Passed`;
+    setOutput(outMsg);
+
+    if (result.complexity) {
+      setComplexity(result.complexity);
+    }
+  };
+
   const handleRun = async () => {
     setIsRunning(true);
     setOutput(null);
@@ -57,45 +109,53 @@ def invertTree(root: TreeNode) -> TreeNode:
     setTestCases(prev => prev.map(tc => ({ ...tc, status: "pending", actual: null })));
 
     try {
-      const result = await executeCode(code, language);
-      
-      if (result.error) {
-        setOutput(result.error);
-        // Mark all as failed if system error
-        setTestCases(prev => prev.map(tc => ({ ...tc, status: "failed" })));
-      } else {
-        // Update test cases based on result
-        const newTestCases = testCases.map(tc => {
-          const res = result.results.find(r => r.id === tc.id);
-          return {
-            ...tc,
-            status: res?.passed ? "passed" : "failed",
-            actual: res?.actual
-          };
-        });
-        setTestCases(newTestCases);
-        
-        const passedCount = result.results.filter(r => r.passed).length;
-        const totalCount = result.results.length;
-        
-        let outMsg = "";
-        if (result.output) {
-             outMsg += `Output:\n${result.output}\n\n`;
-        }
-        outMsg += `Test Run Completed: ${passedCount}/${totalCount} Passed`;
-        setOutput(outMsg);
+      const job = await submitCodeJob(code, language);
+      const socket = openCodeJobSocket(job.job_id);
+      jobRef.current = { id: job.job_id, socket };
 
-        if (result.complexity) {
-          setComplexity(result.complexity);
+      socket.onmessage = (evt) => {
+        const event = JSON.parse(evt.data);
+        if (event.type === 'case') {
+          // Each test case shows up as soon as it finishes
+          const res = event.payload;
+          setTestCases(prev => prev.map(tc => (
+            tc.id === res.id ? { ...tc, status: res.passed ? "passed" : "failed", actual: res.actual } : tc
+          )));
+        } else if (event.type === 'done') {
+          showResult(event.payload);
+          finishJob();
+        } else if (event.type === 'cancelled') {
+          setOutput("Run cancelled.");
+          finishJob();
+        } else if (event.type === 'error') {
+          setOutput(`Execution failed: ${event.payload.message}`);
+          finishJob();
         }
-      }
+      };
+      socket.onclose = () => {
+        // Closed before a done or cancelled event arrived
+        if (jobRef.current?.socket === socket) {
+          setOutput("Execution failed: lost connection to the runner");
+          finishJob();
+        }
+      };
     } catch (error) {
       setOutput(`Execution failed: ${error.message}`);
-    } finally {
       setIsRunning(false);
     }
   };
 
+  const handleCancel = async () => {
+    const job = jobRef.current;
+    if (!job) return;
+    try {
+      // The socket's "cancelled" event finishes the run
+      await cancelCodeJob(job.id);
+    } catch (error) {
+      setOutput(`Cancel failed: ${error.message}`);
+    }
+  };
+
   const handleSenseiHint = () => {
     setShowSensei(true);
   };
@@ -216,6 +276,16 @@ def invertTree(root: TreeNode) -> TreeNode:
             >
               <RotateCcw size={16} />
             </button>
+            {isRunning && (
+              <button 
+                onClick={handleCancel}
+                className="flex items-center gap-2 px-4 py-2 rounded-lg font-bold text-sm text-red-400 border border-red-500/30 hover:bg-red-500/10 transition-all"
+                title="Stop the running code"
+              >
+                <XCircle size={16} />
+                Cancel
+              </button>
+            )}
             <button 
               onClick={handleRun}
               disabled={isRunning}
@@ -28,7 +28,7 @@ import {
 } from 'lucide-react';
 import { Button } from './ui/button';
 import { auth } from '../lib/firebase';
-import { getResumes, uploadResume } from '../services/api';
+import { getResumes, setDefaultResume, uploadResume } from '../services/api';
 
 export default function Settings() {
   const navigate = useNavigate();
@@ -71,6 +71,15 @@ export default function Settings() {
     }
   };
 
+  const handleSetDefault = async (resumeId) => {
+    try {
+      await setDefaultResume(resumeId);
+      loadResumes();
+    } catch (error) {
+      console.error("Failed to set default resume", error);
+    }
+  };
+
   const handleUploadClick = () => {
     fileInputRef.current?.click();
   };
@@ -238,7 +247,7 @@ export default function Settings() {
                     {resume.is_default ? (
                       <span className="text-[10px] bg-green-500/10 text-green-400 px-2 py-1 rounded border border-green-500/20 font-mono tracking-wider">ACTIVE_CONTEXT</span>
                     ) : (
-                      <button className="text-xs text-slate-500 hover:text-white transition-colors font-mono">SET_DEFAULT</button>
+                      <button onClick={() => handleSetDefault(resume.id)} className="text-xs text-slate-500 hover:text-white transition-colors font-mono">SET_DEFAULT</button>
                     )}
                     <button className="text-slate-600 hover:text-red-400 transition-colors">
                       <Trash2 size={16} />
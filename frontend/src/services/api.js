@@ -23,6 +23,11 @@ export async function getResumes() {
   return res.data
 }
 
+export async function setDefaultResume(resumeId) {
+  const res = await api.post(`/api/resume/${resumeId}/default`)
+  return res.data
+}
+
 export async function startInterview({ resumeId, role, jobDescription, numQuestions }) {
   const res = await api.post('/api/interview/start', {
     resume_id: resumeId || null,
@@ -70,14 +75,39 @@ export async function addTrackerJob(job) {
   return res.data
 }
 
-export async function executeCode(code, language = 'python') {
+export async function executeCode(code, language = 'python', { problemId = null, analyzeComplexity = false } = {}) {
   const res = await api.post('/api/dojo/execute', {
     code,
     language,
+    problem_id: problemId,
+    analyze_complexity: analyzeComplexity,
+  })
+  return res.data
+}
+
+export async function submitCodeJob(code, language = 'python', { problemId = null, analyzeComplexity = false } = {}) {
+  const res = await api.post('/api/dojo/jobs', {
+    code,
+    language,
+    problem_id: problemId,
+    analyze_complexity: analyzeComplexity,
   })
   return res.data
 }
 
+export async function cancelCodeJob(jobId) {
+  const res = await api.delete(`/api/dojo/jobs/${jobId}`)
+  return res.data
+}
+
+// Streams {type, payload} events for a submitted job: status, case, then done or cancelled
+export function openCodeJobSocket(jobId) {
+  const url = new URL(BASE_URL || window.location.origin, window.location.origin)
+  url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:'
+  url.pathname = `${url.pathname.replace(/\/$/, '')}/ws/dojo/${jobId}`
+  return new WebSocket(url.toString())
+}
+
 export async function searchCompanyIntel(company) {
   const res = await api.post('/api/recon/search', {
     company,